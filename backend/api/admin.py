@@ -0,0 +1,27 @@
+from django.contrib import admin
+
+from .models import Job, ProfilingRule
+
+
+@admin.register(ProfilingRule)
+class ProfilingRuleAdmin(admin.ModelAdmin):
+    list_display = ("view", "sample_rate", "is_active")
+    list_editable = ("sample_rate", "is_active")
+    list_display_links = ("view",)
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("kind", "user", "status", "created_at", "finished_at")
+    list_filter = ("status", "kind")
+    exclude = ("result",)
+    readonly_fields = (
+        "user",
+        "kind",
+        "filename",
+        "content_type",
+        "error",
+        "created_at",
+        "started_at",
+        "finished_at",
+    )
@@ -3,3 +3,13 @@ from django.apps import AppConfig
 
 class ApiConfig(AppConfig):
     name = "api"
+
+    def ready(self):
+        from django.conf import settings
+
+        from .instrumentation import instrument_serializers
+
+        if settings.REQUEST_INSTRUMENTATION:
+            instrument_serializers()
+
+        from . import signals  # noqa: F401
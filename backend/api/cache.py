@@ -0,0 +1,164 @@
+import hashlib
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+
+from .metrics import CACHE_OPERATIONS
+
+SHARED_CACHE_ALIAS = "default"
+LOCAL_CACHE_ALIAS = "local"
+
+_missing = object()
+_bypassed = ContextVar("cache_bypassed", default=False)
+_counters = defaultdict(lambda: defaultdict(float))
+_counters_lock = Lock()
+
+
+def record(namespace, event, latency):
+    with _counters_lock:
+        counters = _counters[namespace]
+        counters[event] += 1
+        counters["latency"] += latency
+    CACHE_OPERATIONS.labels(namespace, event).inc()
+
+
+def get_cache_stats():
+    with _counters_lock:
+        snapshot = {
+            namespace: dict(counters)
+            for namespace, counters in _counters.items()
+        }
+    stats = {}
+    for namespace, counters in snapshot.items():
+        hits = counters.get("hit", 0) + counters.get("local_hit", 0)
+        lookups = hits + counters.get("miss", 0)
+        operations = sum(
+            value for event, value in counters.items() if event != "latency"
+        )
+        stats[namespace] = {
+            "hits": int(hits),
+            "local_hits": int(counters.get("local_hit", 0)),
+            "misses": int(counters.get("miss", 0)),
+            "sets": int(counters.get("set", 0)),
+            "deletes": int(counters.get("delete", 0)),
+            "hit_ratio": round(hits / lookups, 4) if lookups else None,
+            "avg_latency_ms": (
+                round(counters["latency"] * 1000 / operations, 4)
+                if operations else None
+            ),
+        }
+    return stats
+
+
+@contextmanager
+def bypass_caches():
+    token = _bypassed.set(True)
+    try:
+        yield
+    finally:
+        _bypassed.reset(token)
+
+
+class NamespacedCache:
+    def __init__(self, namespace, timeout=DEFAULT_TIMEOUT, use_local=True):
+        self.namespace = namespace
+        self.timeout = timeout
+        self.use_local = use_local
+
+    @property
+    def shared(self):
+        return caches[SHARED_CACHE_ALIAS]
+
+    @property
+    def local(self):
+        shared_backend = settings.CACHES[SHARED_CACHE_ALIAS]["BACKEND"]
+        local_backend = settings.CACHES[LOCAL_CACHE_ALIAS]["BACKEND"]
+        if not self.use_local or shared_backend == local_backend:
+            return None
+        return caches[LOCAL_CACHE_ALIAS]
+
+    @property
+    def version_key(self):
+        return f"{self.namespace}:version"
+
+    def _get_version(self):
+        local = self.local
+        version = local.get(self.version_key) if local else None
+        if version is None:
+            version = self.shared.get_or_set(
+                self.version_key, int(time.time()), None
+            )
+            if local:
+                local.set(self.version_key, version)
+        return version
+
+    def make_key(self, key):
+        digest = hashlib.md5(str(key).encode()).hexdigest()
+        return f"{self.namespace}:{self._get_version()}:{digest}"
+
+    def get(self, key, default=None):
+        if _bypassed.get():
+            return default
+        start = time.perf_counter()
+        cache_key = self.make_key(key)
+        local = self.local
+        event = "local_hit"
+        value = local.get(cache_key, _missing) if local else _missing
+        if value is _missing:
+            event = "hit"
+            value = self.shared.get(cache_key, _missing)
+            if value is not _missing and local:
+                local.set(cache_key, value)
+        if value is _missing:
+            event = "miss"
+            value = default
+        record(self.namespace, event, time.perf_counter() - start)
+        return value
+
+    def set(self, key, value):
+        if _bypassed.get():
+            return
+        start = time.perf_counter()
+        cache_key = self.make_key(key)
+        self.shared.set(cache_key, value, self.timeout)
+        if self.local:
+            self.local.set(cache_key, value)
+        record(self.namespace, "set", time.perf_counter() - start)
+
+    def delete(self, key):
+        start = time.perf_counter()
+        cache_key = self.make_key(key)
+        self.shared.delete(cache_key)
+        if self.local:
+            self.local.delete(cache_key)
+        record(self.namespace, "delete", time.perf_counter() - start)
+
+    def get_or_set(self, key, default):
+        value = self.get(key, _missing)
+        if value is _missing:
+            value = default()
+            self.set(key, value)
+        return value
+
+    def clear(self):
+        try:
+            self.shared.incr(self.version_key)
+        except ValueError:
+            self.shared.set(self.version_key, int(time.time()), None)
+        if self.local:
+            self.local.delete(self.version_key)
+        record(self.namespace, "delete", 0)
+
+
+ingredients_cache = NamespacedCache("ingredients")
+profiling_cache = NamespacedCache("profiling", timeout=60)
+recipes_cache = NamespacedCache("recipes")
+tokens_cache = NamespacedCache(
+    "tokens", timeout=settings.AUTH_TOKEN_CACHE_TIMEOUT, use_local=False
+)
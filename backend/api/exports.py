@@ -0,0 +1,41 @@
+import io
+
+from django.conf import settings
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfbase import pdfmetrics, ttfonts
+from reportlab.pdfgen import canvas
+
+from .metrics import SHOPPING_CART_PDF_DURATION
+
+SHOPPING_CART_FILENAME = "shopping_cart.pdf"
+
+font_object = ttfonts.TTFont("Arial", settings.BASE_DIR / "fonts/arialmt.ttf")
+pdfmetrics.registerFont(font_object)
+
+
+def render_shopping_cart_pdf(ingredients):
+    buffer = io.BytesIO()
+    with SHOPPING_CART_PDF_DURATION.time():
+        p = canvas.Canvas(buffer, bottomup=0, pagesize=A4)
+        height = A4[1]
+        p.setFont("Arial", 14)
+        y = 50
+        p.drawString(50, y, "Список ингредиентов:")
+        y += 20
+        for i, ingredient in enumerate(ingredients, 1):
+            p.drawString(
+                70,
+                y,
+                f"{i}. {ingredient['name']}"
+                f" ({ingredient['measurement_unit']})"
+                f" - {ingredient['amount']}",
+            )
+            y += 20
+            if y > height - 50:
+                p.showPage()
+                p.setFont("Arial", 14)
+                y = 50
+
+        p.showPage()
+        p.save()
+    return buffer.getvalue()
@@ -0,0 +1,11 @@
+from drf_extra_fields.fields import Base64ImageField as BaseBase64ImageField
+
+from .metrics import IMAGE_DECODED_BYTES
+
+
+class Base64ImageField(BaseBase64ImageField):
+    def to_internal_value(self, base64_data):
+        image = super().to_internal_value(base64_data)
+        if image is not None:
+            IMAGE_DECODED_BYTES.observe(image.size)
+        return image
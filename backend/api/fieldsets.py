@@ -0,0 +1,52 @@
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+import const
+
+
+def get_query_list(request, name):
+    if request is None or request.method not in SAFE_METHODS:
+        return None
+    value = request.query_params.get(name)
+    if value is None:
+        return None
+    return {item.strip() for item in value.split(",") if item.strip()}
+
+
+class Fieldset:
+    def __init__(self, request):
+        self.fields = get_query_list(request, const.FIELDS_QUERY_PARAM)
+        self.expand = get_query_list(request, const.EXPAND_QUERY_PARAM)
+
+    def is_requested(self, field_name):
+        return self.fields is None or field_name in self.fields
+
+    def is_expanded(self, field_name):
+        return self.is_requested(field_name) and (
+            self.fields is None or field_name in (self.expand or ())
+        )
+
+
+class SparseFieldsetMixin:
+    expandable_fields = {}
+
+    def is_root(self):
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        return parent is None
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if not self.is_root():
+            return fields
+        fieldset = Fieldset(self.context.get("request"))
+        for field_name in list(fields):
+            if not fieldset.is_requested(field_name):
+                del fields[field_name]
+            elif (
+                field_name in self.expandable_fields
+                and not fieldset.is_expanded(field_name)
+            ):
+                fields[field_name] = self.expandable_fields[field_name]()
+        return fields
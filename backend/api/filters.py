@@ -1,15 +1,20 @@
 from django_filters.rest_framework import FilterSet, filters
 
 from food.models import Ingredient, Recipe
+from foodgram_backend.db import trigram_search
 
 
 class IngredientFilter(FilterSet):
     name = filters.CharFilter(field_name="name", lookup_expr="istartswith")
+    search = filters.CharFilter(method="filter_search")
 
     class Meta:
         model = Ingredient
         fields = ("name",)
 
+    def filter_search(self, queryset, name, value):
+        return trigram_search(queryset, ("name",), value)
+
 
 class RecipeFilter(FilterSet):
     author = filters.NumberFilter()
@@ -0,0 +1,82 @@
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from rest_framework import serializers
+from rest_framework.response import Response
+
+current_metrics = ContextVar("current_metrics", default=None)
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.view = None
+        self.queries = 0
+        self.timings = defaultdict(float)
+        self._depth = defaultdict(int)
+
+    @property
+    def total(self):
+        return time.perf_counter() - self.start
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries += 1
+        with self.timer("db"):
+            return execute(sql, params, many, context)
+
+    @contextmanager
+    def timer(self, name):
+        self._depth[name] += 1
+        start = time.perf_counter()
+        db_start = self.timings["db"]
+        try:
+            yield
+        finally:
+            self._depth[name] -= 1
+            if not self._depth[name]:
+                elapsed = time.perf_counter() - start
+                if name != "db":
+                    elapsed -= self.timings["db"] - db_start
+                self.timings[name] += elapsed
+
+
+@contextmanager
+def timer(name):
+    metrics = current_metrics.get()
+    if metrics is None:
+        yield
+        return
+    with metrics.timer(name):
+        yield
+
+
+def timed_property(name, prop):
+    def getter(self):
+        with timer(name):
+            return prop.fget(self)
+
+    return property(getter)
+
+
+def get_view_name(view_func, method):
+    view_class = getattr(view_func, "cls", None)
+    if view_class is None:
+        return f"{view_func.__module__}.{view_func.__name__}"
+    actions = getattr(view_func, "actions", None) or {}
+    action = actions.get(method.lower(), method.lower())
+    return f"{view_class.__name__}.{action}"
+
+
+def instrument_serializers():
+    for serializer_class in (
+        serializers.Serializer,
+        serializers.ListSerializer,
+    ):
+        serializer_class.data = timed_property(
+            "serializer", serializer_class.data
+        )
+    Response.rendered_content = timed_property(
+        "render", Response.rendered_content
+    )
@@ -0,0 +1,87 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from food.shopping_list import get_shopping_list
+
+from .exports import SHOPPING_CART_FILENAME, render_shopping_cart_pdf
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+JOB_HANDLERS = {}
+
+
+class JobError(Exception):
+    pass
+
+
+def job_handler(kind):
+    def register(function):
+        JOB_HANDLERS[kind] = function
+        return function
+
+    return register
+
+
+@job_handler("shopping_cart_pdf")
+def export_shopping_cart(job):
+    ingredients = get_shopping_list(job.user)
+    if not ingredients:
+        raise JobError("Shopping list empty")
+    return (
+        SHOPPING_CART_FILENAME,
+        "application/pdf",
+        render_shopping_cart_pdf(ingredients),
+    )
+
+
+def claim_job():
+    now = timezone.now()
+    stale_before = now - timedelta(seconds=settings.JOB_STALE_TIMEOUT)
+    with transaction.atomic():
+        job = Job.objects.select_for_update(skip_locked=True).filter(
+            Q(status=Job.Status.PENDING)
+            | Q(status=Job.Status.RUNNING, started_at__lt=stale_before)
+        ).order_by("created_at").first()
+        if job is not None:
+            job.status = Job.Status.RUNNING
+            job.started_at = now
+            job.save(update_fields=("status", "started_at"))
+    return job
+
+
+def run_job(job):
+    try:
+        job.filename, job.content_type, job.result = JOB_HANDLERS[job.kind](
+            job
+        )
+        job.status = Job.Status.DONE
+    except Exception as error:
+        if not isinstance(error, JobError):
+            logger.exception("Job %s failed", job.pk)
+        job.status = Job.Status.FAILED
+        job.error = str(error)
+    job.finished_at = timezone.now()
+    job.save(
+        update_fields=(
+            "filename",
+            "content_type",
+            "result",
+            "status",
+            "error",
+            "finished_at",
+        )
+    )
+    return job
+
+
+def delete_expired_jobs():
+    return Job.objects.filter(
+        finished_at__lt=timezone.now()
+        - timedelta(seconds=settings.JOB_RESULT_TTL)
+    ).delete()[0]
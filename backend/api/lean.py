@@ -0,0 +1,109 @@
+from collections import defaultdict
+
+from food.models import IngredientRecipe, Recipe
+from users.models import User
+
+from .fieldsets import Fieldset
+from .serializers import RecipeSerializer
+
+AUTHOR_COLUMNS = ("email", "username", "first_name", "last_name", "avatar")
+USER_FLAGS = ("is_favorited", "is_in_shopping_cart")
+
+
+def file_url(field, name, request):
+    if not name:
+        return None
+    url = field.storage.url(name)
+    if request is not None:
+        return request.build_absolute_uri(url)
+    return url
+
+
+class LeanRecipeSerializer:
+    def __init__(self, request):
+        fieldset = Fieldset(request)
+        self.request = request
+        self.fields = [
+            field_name for field_name in RecipeSerializer.Meta.fields
+            if fieldset.is_requested(field_name)
+        ]
+        self.expand_author = fieldset.is_expanded("author")
+        self.authenticated = request.user.is_authenticated
+        self.image_field = Recipe._meta.get_field("image")
+        self.avatar_field = User._meta.get_field("avatar")
+
+    def values(self, queryset):
+        columns = ["id"]
+        for field_name in self.fields:
+            if field_name == "author":
+                columns.append("author_id")
+                if self.expand_author:
+                    columns.extend(
+                        f"author__{column}" for column in AUTHOR_COLUMNS
+                    )
+                    if self.authenticated:
+                        columns.append("is_author_subscribed")
+            elif field_name in USER_FLAGS:
+                if self.authenticated:
+                    columns.append(field_name)
+            elif field_name not in ("id", "ingredients"):
+                columns.append(field_name)
+        return queryset.prefetch_related(None).values(*columns)
+
+    def get_ingredients(self, rows):
+        ingredients = defaultdict(list)
+        ingredient_recipes = IngredientRecipe.objects.filter(
+            recipe_id__in=[row["id"] for row in rows]
+        ).order_by("pk").values_list(
+            "recipe_id",
+            "ingredient_id",
+            "ingredient__name",
+            "ingredient__measurement_unit",
+            "amount",
+        )
+        for recipe_id, *values in ingredient_recipes:
+            ingredients[recipe_id].append(
+                dict(zip(("id", "name", "measurement_unit", "amount"), values))
+            )
+        return ingredients
+
+    def get_author(self, row):
+        if not self.expand_author:
+            return row["author_id"]
+        return {
+            "email": row["author__email"],
+            "id": row["author_id"],
+            "username": row["author__username"],
+            "first_name": row["author__first_name"],
+            "last_name": row["author__last_name"],
+            "is_subscribed": (
+                self.authenticated and row["is_author_subscribed"]
+            ),
+            "avatar": file_url(
+                self.avatar_field, row["author__avatar"], self.request
+            ),
+        }
+
+    def to_representation(self, row, ingredients):
+        representation = {}
+        for field_name in self.fields:
+            if field_name == "author":
+                value = self.get_author(row)
+            elif field_name == "ingredients":
+                value = ingredients[row["id"]]
+            elif field_name in USER_FLAGS:
+                value = self.authenticated and row[field_name]
+            elif field_name == "image":
+                value = file_url(self.image_field, row["image"], self.request)
+            else:
+                value = row[field_name]
+            representation[field_name] = value
+        return representation
+
+    def represent(self, rows):
+        rows = list(rows)
+        ingredients = (
+            self.get_ingredients(rows) if "ingredients" in self.fields
+            else None
+        )
+        return [self.to_representation(row, ingredients) for row in rows]
@@ -0,0 +1,64 @@
+import sys
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.profiling import PROFILE_SUFFIX
+
+
+class Command(BaseCommand):
+    help = (
+        "Объединяет снятые профили в один файл в формате collapsed stacks "
+        "для flamegraph.pl, speedscope и аналогичных инструментов."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dir", type=Path, default=settings.PROFILING_DIR
+        )
+        parser.add_argument(
+            "--view",
+            default=None,
+            help="Например, RecipeViewSet.download_shopping_cart.",
+        )
+        parser.add_argument(
+            "--since",
+            type=datetime.fromisoformat,
+            default=None,
+            help="Учитывать профили не старше даты в формате ISO 8601.",
+        )
+        parser.add_argument("--output", type=Path, default=None)
+
+    def handle(self, *args, **options):
+        stacks = Counter()
+        profiles = 0
+        for path in options["dir"].glob(f"*{PROFILE_SUFFIX}"):
+            view, timestamp, _ = path.name.removesuffix(
+                PROFILE_SUFFIX
+            ).rsplit(".", 2)
+            if options["view"] and view != options["view"]:
+                continue
+            if options["since"] and datetime.fromtimestamp(
+                int(timestamp) / 1000
+            ) < options["since"]:
+                continue
+            profiles += 1
+            for line in path.read_text().splitlines():
+                stack, _, count = line.rpartition(" ")
+                stacks[stack] += int(count)
+
+        output = (
+            open(options["output"], "w") if options["output"] else sys.stdout
+        )
+        try:
+            for stack, count in stacks.most_common():
+                output.write(f"{stack} {count}\n")
+        finally:
+            if options["output"]:
+                output.close()
+        self.stderr.write(
+            f"Профилей: {profiles}, уникальных стеков: {len(stacks)}"
+        )
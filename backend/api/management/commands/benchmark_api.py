@@ -0,0 +1,305 @@
+import json
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Q
+from rest_framework.test import APIClient
+
+from food.models import Ingredient, Purchase, Recipe
+from food.short_links import encode_short_code
+from users.models import Subscription, User
+
+BENCHMARK_USERNAME = "benchmark-api"
+BENCHMARK_EMAIL = f"{BENCHMARK_USERNAME}@example.com"
+BENCHMARK_PASSWORD = "seasoned-carrot-42"
+IMAGE = (
+    "data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAA"
+    "DUlEQVR42mNk+M9QDwADhgGAWjR9awAAAABJRU5ErkJggg=="
+)
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = (
+        "Прогоняет запросы ко всем маршрутам API внутри процесса и выводит "
+        "пропускную способность, перцентили задержки и число SQL-запросов."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=50)
+        parser.add_argument("--warmup", type=int, default=3)
+        parser.add_argument("--only", nargs="*", default=None)
+        parser.add_argument("--host", default=settings.ALLOWED_HOSTS[0])
+        parser.add_argument("--json", action="store_true")
+
+    def handle(self, *args, **options):
+        if options["requests"] < 2:
+            raise CommandError("--requests должно быть не меньше 2.")
+        purchase = Purchase.objects.order_by("pk").first()
+        recipe = Recipe.objects.order_by("-pk").first()
+        ingredient = Ingredient.objects.order_by("pk").first()
+        if purchase is None or recipe is None or ingredient is None:
+            raise CommandError(
+                "База пуста, заполните её командой generate_fake_data."
+            )
+        user = purchase.user
+        subscription = (
+            Subscription.objects.filter(subscriber=user).order_by("pk").first()
+            or Subscription.objects.order_by("pk").first()
+        )
+        if subscription is None:
+            raise CommandError(
+                "В базе нет подписок, заполните её командой "
+                "generate_fake_data."
+            )
+        author = subscription.author
+        other_author = User.objects.exclude(
+            pk__in=[user.pk, author.pk]
+        ).exclude(subscribers__subscriber=user).order_by("pk").first()
+        toggled_recipe = Recipe.objects.exclude(
+            pk__in=user.purchased_recipes.all()
+        ).exclude(pk__in=user.favorite_recipes.all()).order_by("pk").first()
+        if other_author is None or toggled_recipe is None:
+            raise CommandError(
+                "Недостаточно данных для сценариев записи, заполните базу "
+                "командой generate_fake_data."
+            )
+        recipe_data = {
+            "ingredients": [{"id": ingredient.pk, "amount": 10}],
+            "image": IMAGE,
+            "name": "Benchmark",
+            "text": "Benchmark",
+            "cooking_time": 5,
+        }
+
+        scenarios = {
+            "ingredients.list": [
+                ("get", "/api/ingredients/?name=а", "anonymous")
+            ],
+            "ingredients.retrieve": [
+                ("get", f"/api/ingredients/{ingredient.pk}/", "anonymous")
+            ],
+            "recipes.list": [("get", "/api/recipes/", "anonymous")],
+            "recipes.list.auth": [
+                ("get", "/api/recipes/?limit=100", "user")
+            ],
+            "recipes.list.author": [
+                ("get", f"/api/recipes/?author={author.pk}", "user")
+            ],
+            "recipes.list.is_favorited": [
+                ("get", "/api/recipes/?is_favorited=1", "user")
+            ],
+            "recipes.list.is_in_shopping_cart": [
+                ("get", "/api/recipes/?is_in_shopping_cart=1", "user")
+            ],
+            "recipes.retrieve": [
+                ("get", f"/api/recipes/{recipe.pk}/", "user")
+            ],
+            "recipes.write": [
+                ("post", "/api/recipes/", "benchmark", recipe_data),
+                ("patch", "/api/recipes/{id}/", "benchmark", recipe_data),
+                ("delete", "/api/recipes/{id}/", "benchmark"),
+            ],
+            "recipes.get_link": [
+                ("get", f"/api/recipes/{recipe.pk}/get-link/", "anonymous")
+            ],
+            "recipes.favorite": [
+                (
+                    "post",
+                    f"/api/recipes/{toggled_recipe.pk}/favorite/",
+                    "user",
+                ),
+                (
+                    "delete",
+                    f"/api/recipes/{toggled_recipe.pk}/favorite/",
+                    "user",
+                ),
+            ],
+            "recipes.shopping_cart": [
+                (
+                    "post",
+                    f"/api/recipes/{toggled_recipe.pk}/shopping_cart/",
+                    "user",
+                ),
+                (
+                    "delete",
+                    f"/api/recipes/{toggled_recipe.pk}/shopping_cart/",
+                    "user",
+                ),
+            ],
+            "recipes.download_shopping_cart": [
+                ("get", "/api/recipes/download_shopping_cart/", "user")
+            ],
+            "users.list": [("get", "/api/users/", "anonymous")],
+            "users.create": [
+                (
+                    "post",
+                    "/api/users/",
+                    "anonymous",
+                    lambda number: {
+                        "email": f"{BENCHMARK_USERNAME}-{number}@example.com",
+                        "username": f"{BENCHMARK_USERNAME}-{number}",
+                        "first_name": "Бенчмарк",
+                        "last_name": "Бенчмарк",
+                        "password": BENCHMARK_PASSWORD,
+                    },
+                )
+            ],
+            "users.retrieve": [("get", f"/api/users/{author.pk}/", "user")],
+            "users.me": [("get", "/api/users/me/", "user")],
+            "users.set_password": [
+                (
+                    "post",
+                    "/api/users/set_password/",
+                    "benchmark",
+                    {
+                        "current_password": BENCHMARK_PASSWORD,
+                        "new_password": BENCHMARK_PASSWORD,
+                    },
+                )
+            ],
+            "users.avatar": [
+                (
+                    "put",
+                    "/api/users/me/avatar/",
+                    "benchmark",
+                    {"avatar": IMAGE},
+                ),
+                ("delete", "/api/users/me/avatar/", "benchmark"),
+            ],
+            "users.subscriptions": [
+                ("get", "/api/users/subscriptions/", "user")
+            ],
+            "users.subscribe": [
+                ("post", f"/api/users/{other_author.pk}/subscribe/", "user"),
+                (
+                    "delete",
+                    f"/api/users/{other_author.pk}/subscribe/",
+                    "user",
+                ),
+            ],
+            "auth.token_login": [
+                (
+                    "post",
+                    "/api/auth/token/login/",
+                    "anonymous",
+                    {
+                        "email": BENCHMARK_EMAIL,
+                        "password": BENCHMARK_PASSWORD,
+                    },
+                )
+            ],
+            "short_link": [
+                ("get", f"/s/{encode_short_code(recipe.pk)}/", "anonymous")
+            ],
+        }
+        if options["only"]:
+            unknown = set(options["only"]) - set(scenarios)
+            if unknown:
+                raise CommandError(
+                    f"Неизвестные сценарии: {', '.join(sorted(unknown))}."
+                )
+            scenarios = {
+                name: steps for name, steps in scenarios.items()
+                if name in options["only"]
+            }
+
+        self.delete_benchmark_users()
+        benchmark_user = User.objects.create_user(
+            username=BENCHMARK_USERNAME,
+            email=BENCHMARK_EMAIL,
+            password=BENCHMARK_PASSWORD,
+            first_name="Бенчмарк",
+            last_name="Бенчмарк",
+        )
+        self.clients = {
+            name: APIClient(HTTP_HOST=options["host"])
+            for name in ("anonymous", "user", "benchmark")
+        }
+        self.clients["user"].force_authenticate(user)
+        self.clients["benchmark"].force_authenticate(benchmark_user)
+
+        try:
+            results = {
+                name: self.run_scenario(
+                    steps, options["requests"], options["warmup"]
+                )
+                for name, steps in scenarios.items()
+            }
+        finally:
+            self.delete_benchmark_users()
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+        else:
+            self.print_table(results)
+
+    def delete_benchmark_users(self):
+        User.objects.filter(
+            Q(username=BENCHMARK_USERNAME)
+            | Q(username__startswith=f"{BENCHMARK_USERNAME}-")
+        ).delete()
+
+    def run_scenario(self, steps, requests, warmup):
+        latencies = []
+        queries = []
+        statuses = set()
+        for iteration in range(warmup + requests):
+            object_id = None
+            for method, path, client, *data in steps:
+                data = data[0] if data else None
+                if callable(data):
+                    data = data(iteration)
+                request = getattr(self.clients[client], method)
+                path = path.format(id=object_id)
+                counter = QueryCounter()
+                with connection.execute_wrapper(counter):
+                    start = time.perf_counter()
+                    if data is None:
+                        response = request(path)
+                    else:
+                        response = request(path, data, format="json")
+                    if response.streaming:
+                        b"".join(response.streaming_content)
+                    elapsed = time.perf_counter() - start
+                if method == "post" and response.status_code == 201:
+                    object_id = response.json().get("id")
+                if iteration >= warmup:
+                    latencies.append(elapsed)
+                    queries.append(counter.count)
+                    statuses.add(response.status_code)
+        percentiles = statistics.quantiles(latencies, n=100)
+        return {
+            "requests": len(latencies),
+            "statuses": sorted(statuses),
+            "rps": round(len(latencies) / sum(latencies), 1),
+            "p50_ms": round(percentiles[49] * 1000, 2),
+            "p90_ms": round(percentiles[89] * 1000, 2),
+            "p99_ms": round(percentiles[98] * 1000, 2),
+            "queries": round(statistics.mean(queries), 1),
+        }
+
+    def print_table(self, results):
+        columns = ("rps", "p50_ms", "p90_ms", "p99_ms", "queries")
+        width = max(len(name) for name in results) + 2
+        self.stdout.write(
+            "scenario".ljust(width)
+            + "".join(column.rjust(10) for column in columns)
+            + "  statuses"
+        )
+        for name, result in results.items():
+            self.stdout.write(
+                name.ljust(width)
+                + "".join(str(result[column]).rjust(10) for column in columns)
+                + f"  {result['statuses']}"
+            )
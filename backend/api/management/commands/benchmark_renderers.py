@@ -0,0 +1,68 @@
+import gzip
+import json
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from users.models import Subscription
+
+from ...renderers import ORJSONRenderer, orjson
+
+PAYLOADS = {
+    "recipes.list": "/api/recipes/?limit=100",
+    "users.subscriptions": "/api/users/subscriptions/?limit=100",
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнивает время и размер сериализации ответов API стандартным "
+        "JSONRenderer и ORJSONRenderer."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=200)
+        parser.add_argument("--host", default=settings.ALLOWED_HOSTS[0])
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            raise CommandError("orjson не установлен.")
+        subscription = Subscription.objects.order_by("pk").first()
+        if subscription is None:
+            raise CommandError(
+                "База пуста, заполните её командой generate_fake_data."
+            )
+        client = APIClient(HTTP_HOST=options["host"])
+        client.force_authenticate(subscription.subscriber)
+        renderers = {
+            "json": JSONRenderer(),
+            "orjson": ORJSONRenderer(),
+        }
+        self.stdout.write(
+            "payload".ljust(22)
+            + "renderer".ljust(10)
+            + "ms".rjust(10)
+            + "bytes".rjust(10)
+            + "gzip".rjust(10)
+        )
+        for name, path in PAYLOADS.items():
+            data = client.get(path).data
+            rendered = {}
+            for renderer_name, renderer in renderers.items():
+                start = time.perf_counter()
+                for _ in range(options["iterations"]):
+                    content = renderer.render(data)
+                elapsed = (time.perf_counter() - start) / options["iterations"]
+                rendered[renderer_name] = content
+                self.stdout.write(
+                    name.ljust(22)
+                    + renderer_name.ljust(10)
+                    + f"{elapsed * 1000:.3f}".rjust(10)
+                    + str(len(content)).rjust(10)
+                    + str(len(gzip.compress(content))).rjust(10)
+                )
+            if json.loads(rendered["json"]) != json.loads(rendered["orjson"]):
+                raise CommandError(f"{name}: ответы рендереров различаются.")
@@ -0,0 +1,113 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from food.models import Purchase
+
+from ...lean import LeanRecipeSerializer
+from ...serializers import RecipeSerializer
+from ...views import RecipeViewSet
+
+CASES = {
+    "anonymous": ({"limit": 100}, False),
+    "authorized": ({"limit": 100}, True),
+    "is_in_shopping_cart": ({"is_in_shopping_cart": 1}, True),
+    "fields": (
+        {"limit": 100, "fields": "id,name,image,is_favorited,author"},
+        True,
+    ),
+    "expand": (
+        {"limit": 100, "fields": "id,author,ingredients", "expand": "author"},
+        True,
+    ),
+}
+
+
+def make_view(params, user, host):
+    request = APIRequestFactory().get(
+        "/api/recipes/", params, HTTP_HOST=host
+    )
+    if user is not None:
+        force_authenticate(request, user)
+    view = RecipeViewSet(
+        action_map={"get": "list"},
+        args=(),
+        kwargs={},
+        format_kwarg=None,
+        headers={},
+    )
+    view.request = view.initialize_request(request)
+    return view
+
+
+def serialize(view):
+    queryset = view.filter_queryset(view.get_queryset())
+    return RecipeSerializer(
+        view.paginate_queryset(queryset),
+        many=True,
+        context=view.get_serializer_context(),
+    ).data
+
+
+def serialize_lean(view):
+    serializer = LeanRecipeSerializer(view.request)
+    queryset = serializer.values(view.filter_queryset(view.get_queryset()))
+    return serializer.represent(view.paginate_queryset(queryset))
+
+
+def measure(function, view, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        data = function(view)
+    return (time.perf_counter() - start) / iterations, data
+
+
+class Command(BaseCommand):
+    help = (
+        "Проверяет, что облегчённый сериализатор списка рецептов отдаёт тот "
+        "же JSON, что и RecipeSerializer, и сравнивает их скорость."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument("--host", default=settings.ALLOWED_HOSTS[0])
+
+    def handle(self, *args, **options):
+        purchase = Purchase.objects.order_by("?").first()
+        if purchase is None:
+            raise CommandError(
+                "База пуста, заполните её командой generate_fake_data."
+            )
+        renderer = JSONRenderer()
+        self.stdout.write(
+            "case".ljust(22)
+            + "items".rjust(8)
+            + "drf_us".rjust(10)
+            + "lean_us".rjust(10)
+            + "speedup".rjust(10)
+        )
+        for name, (params, authorized) in CASES.items():
+            view = make_view(
+                params,
+                purchase.user if authorized else None,
+                options["host"],
+            )
+            elapsed, data = measure(serialize, view, options["iterations"])
+            lean_elapsed, lean_data = measure(
+                serialize_lean, view, options["iterations"]
+            )
+            if renderer.render(data) != renderer.render(lean_data):
+                raise CommandError(
+                    f"{name}: ответы сериализаторов различаются."
+                )
+            items = max(len(data), 1)
+            self.stdout.write(
+                name.ljust(22)
+                + str(len(data)).rjust(8)
+                + f"{elapsed * 1e6 / items:.1f}".rjust(10)
+                + f"{lean_elapsed * 1e6 / items:.1f}".rjust(10)
+                + f"{elapsed / lean_elapsed:.1f}x".rjust(10)
+            )
@@ -0,0 +1,72 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from rest_framework.test import APIClient
+
+from food.models import Purchase
+from users.models import Subscription
+
+from ...query_plans import HOT_QUERIES, SCANNERS, explain_hot_query
+
+
+class Command(BaseCommand):
+    help = (
+        "Выполняет горячие запросы API на заполненной базе, строит для "
+        "каждого SQL-запроса план через EXPLAIN и завершается с ошибкой, "
+        "если в плане есть последовательное сканирование таблицы. "
+        "Команда ничего не пишет в базу."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default=settings.ALLOWED_HOSTS[0])
+        parser.add_argument(
+            "--allow",
+            nargs="*",
+            default=[],
+            help="Таблицы, сканирование которых допустимо.",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor not in SCANNERS:
+            raise CommandError(
+                f"EXPLAIN для {connection.vendor} не поддержан."
+            )
+        subscription = Subscription.objects.filter(
+            subscriber__purchased_recipes__isnull=False
+        ).order_by("pk").first()
+        if subscription is None:
+            raise CommandError(
+                "База пуста, заполните её командой generate_fake_data."
+            )
+        user = subscription.subscriber
+        context = {
+            "author": subscription.author_id,
+            "recipe": Purchase.objects.filter(user=user).order_by(
+                "pk"
+            ).values_list("recipe_id", flat=True).first(),
+        }
+        clients = {
+            False: APIClient(HTTP_HOST=options["host"]),
+            True: APIClient(HTTP_HOST=options["host"]),
+        }
+        clients[True].force_authenticate(user)
+        failures = 0
+        for name, (_, _, authorized) in HOT_QUERIES.items():
+            response, queries, scans = explain_hot_query(
+                clients[authorized], name, context, options["allow"]
+            )
+            if response.status_code != 200:
+                raise CommandError(f"{name}: ответ {response.status_code}.")
+            for sql, tables in scans:
+                failures += 1
+                self.stdout.write(
+                    self.style.ERROR(
+                        f"{name}: сканирование {', '.join(sorted(tables))}"
+                    )
+                )
+                self.stdout.write(f"    {sql}")
+            self.stdout.write(f"{name}: запросов {queries}")
+        if failures:
+            raise CommandError(
+                f"Запросов с последовательным сканированием: {failures}."
+            )
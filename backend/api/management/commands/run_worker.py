@@ -0,0 +1,72 @@
+import logging
+import signal
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, close_old_connections, connection
+
+from ...jobs import claim_job, delete_expired_jobs, run_job
+
+logger = logging.getLogger("api.jobs")
+
+
+class Command(BaseCommand):
+    help = (
+        "Обрабатывает фоновые задачи (выгрузки) из очереди в базе данных "
+        "пулом потоков."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=1)
+        parser.add_argument(
+            "--poll-interval", type=float, default=settings.JOB_POLL_INTERVAL
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Выйти, когда очередь опустеет.",
+        )
+
+    def handle(self, *args, **options):
+        self.verbosity = options["verbosity"]
+        self.stop = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *args: self.stop.set())
+        workers = [
+            threading.Thread(
+                target=self.work,
+                args=(options["poll_interval"], options["once"]),
+            )
+            for _ in range(options["workers"])
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+    def work(self, poll_interval, once):
+        try:
+            while not self.stop.is_set():
+                close_old_connections()
+                try:
+                    job = claim_job()
+                except DatabaseError:
+                    logger.exception("Failed to claim a job")
+                    self.stop.wait(poll_interval)
+                    continue
+                if job is None:
+                    if once:
+                        return
+                    delete_expired_jobs()
+                    self.stop.wait(poll_interval)
+                    continue
+                start = time.perf_counter()
+                run_job(job)
+                if self.verbosity:
+                    self.stdout.write(
+                        f"{job}: {time.perf_counter() - start:.2f} с"
+                    )
+        finally:
+            connection.close()
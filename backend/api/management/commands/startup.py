@@ -0,0 +1,155 @@
+import hashlib
+import json
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles.finders import get_finders
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.executor import MigrationExecutor
+
+from food.management.commands.import_ingredients import FIXTURE_MODEL
+from food.models import Ingredient
+from users.models import User
+
+INGREDIENT_RECIPE_MODEL = "food.ingredientrecipe"
+USER_MODEL = "users.user"
+
+
+def fingerprint_file(path):
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def fingerprint_static_files():
+    digest = hashlib.sha256()
+    for finder in get_finders():
+        for path, storage in sorted(finder.list([]), key=lambda x: x[0]):
+            stat = Path(storage.path(path)).stat()
+            digest.update(f"{path}:{stat.st_size}:{stat.st_mtime}".encode())
+    return digest.hexdigest()
+
+
+def is_seeded(objects):
+    names = {
+        item["fields"]["name"]
+        for item in objects if item["model"] == FIXTURE_MODEL
+    }
+    user_ids = {item["pk"] for item in objects if item["model"] == USER_MODEL}
+    return (
+        Ingredient.objects.filter(name__in=names).count() == len(names)
+        and User.objects.filter(pk__in=user_ids).count() == len(user_ids)
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Готовит контейнер к запуску: миграции, начальные данные и статика. "
+        "Шаги, результат которых уже актуален, пропускаются."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--fixture", default="db.json")
+        parser.add_argument("--static-target", type=Path, default=None)
+        parser.add_argument(
+            "--state-dir", type=Path, default=settings.STARTUP_STATE_DIR
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Выполнить все шаги независимо от отметок.",
+        )
+
+    def handle(self, *args, **options):
+        self.state_dir = options["state_dir"]
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        self.force = options["force"]
+
+        total_start = time.perf_counter()
+        self.run_phase("migrate", self.migrate)
+        self.run_phase("seed", self.seed, options["fixture"])
+        if options["static_target"]:
+            self.run_phase(
+                "collectstatic", self.collectstatic, options["static_target"]
+            )
+        self.stdout.write(
+            f"startup: всего {time.perf_counter() - total_start:.2f} с"
+        )
+
+    def run_phase(self, name, phase, *args):
+        start = time.perf_counter()
+        done = phase(*args)
+        self.stdout.write(
+            f"startup: {name} "
+            f"{'выполнен' if done else 'пропущен'} "
+            f"за {time.perf_counter() - start:.2f} с"
+        )
+
+    def is_current(self, name, fingerprint):
+        marker = self.state_dir / name
+        return (
+            not self.force
+            and marker.exists()
+            and marker.read_text() == fingerprint
+        )
+
+    def mark_current(self, name, fingerprint):
+        (self.state_dir / name).write_text(fingerprint)
+
+    def migrate(self):
+        connection = connections[DEFAULT_DB_ALIAS]
+        executor = MigrationExecutor(connection)
+        plan = executor.migration_plan(
+            executor.loader.graph.leaf_nodes()
+        )
+        if not plan and not self.force:
+            return False
+        call_command("migrate", interactive=False, verbosity=0)
+        return True
+
+    def seed(self, fixture):
+        fingerprint = fingerprint_file(fixture)
+        with open(fixture, encoding="utf-8") as file:
+            objects = json.load(file)
+        if self.is_current("seed", fingerprint) and is_seeded(objects):
+            return False
+        call_command("import_ingredients", fixture, verbosity=0)
+        fixture_names = {
+            item["pk"]: item["fields"]["name"]
+            for item in objects if item["model"] == FIXTURE_MODEL
+        }
+        ingredient_ids = dict(
+            Ingredient.objects.filter(
+                name__in=fixture_names.values()
+            ).values_list("name", "pk")
+        )
+        objects = [
+            item for item in objects if item["model"] != FIXTURE_MODEL
+        ]
+        for item in objects:
+            if item["model"] == INGREDIENT_RECIPE_MODEL:
+                item["fields"]["ingredient"] = ingredient_ids[
+                    fixture_names[item["fields"]["ingredient"]]
+                ]
+        if objects:
+            with tempfile.NamedTemporaryFile(
+                "w", suffix=".json", encoding="utf-8"
+            ) as rest_fixture:
+                json.dump(objects, rest_fixture)
+                rest_fixture.flush()
+                call_command("loaddata", rest_fixture.name, verbosity=0)
+            call_command("rebuild_shopping_lists", verbosity=0)
+        self.mark_current("seed", fingerprint)
+        return True
+
+    def collectstatic(self, target):
+        fingerprint = fingerprint_static_files()
+        if self.is_current("static", fingerprint) and target.exists():
+            return False
+        call_command("collectstatic", interactive=False, verbosity=0)
+        shutil.copytree(settings.STATIC_ROOT, target, dirs_exist_ok=True)
+        self.mark_current("static", fingerprint)
+        return True
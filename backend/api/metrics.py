@@ -0,0 +1,66 @@
+import os
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY,
+                               CollectorRegistry, Counter, Histogram,
+                               generate_latest, multiprocess)
+
+REQUESTS = Counter(
+    "foodgram_requests_total",
+    "Количество запросов по view и действию.",
+    ["view", "method", "status"],
+)
+REQUEST_DURATION = Histogram(
+    "foodgram_request_duration_seconds",
+    "Время обработки запроса.",
+    ["view"],
+)
+REQUEST_DB_QUERIES = Histogram(
+    "foodgram_request_db_queries",
+    "Количество SQL-запросов на запрос.",
+    ["view"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 200, 500),
+)
+REQUEST_DB_DURATION = Histogram(
+    "foodgram_request_db_duration_seconds",
+    "Суммарное время SQL-запросов на запрос.",
+    ["view"],
+)
+CACHE_OPERATIONS = Counter(
+    "foodgram_cache_operations_total",
+    "Обращения к кэшу по пространствам имён.",
+    ["namespace", "event"],
+)
+SHOPPING_CART_PDF_DURATION = Histogram(
+    "foodgram_shopping_cart_pdf_duration_seconds",
+    "Время формирования PDF со списком покупок.",
+)
+IMAGE_DECODED_BYTES = Histogram(
+    "foodgram_image_decoded_bytes",
+    "Размер изображений, декодированных из base64.",
+    buckets=(
+        10_000, 50_000, 100_000, 250_000, 500_000,
+        1_000_000, 2_500_000, 5_000_000, 10_000_000,
+    ),
+)
+
+
+def observe_request(view, method, status, duration, queries, db_duration):
+    view = view or "unresolved"
+    REQUESTS.labels(view, method, status).inc()
+    REQUEST_DURATION.labels(view).observe(duration)
+    REQUEST_DB_QUERIES.labels(view).observe(queries)
+    REQUEST_DB_DURATION.labels(view).observe(db_duration)
+
+
+def metrics_view(request):
+    if not settings.METRICS_ENABLED:
+        raise Http404
+    registry = REGISTRY
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return HttpResponse(
+        generate_latest(registry), content_type=CONTENT_TYPE_LATEST
+    )
@@ -0,0 +1,103 @@
+import json
+import logging
+import threading
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+from .instrumentation import RequestMetrics, current_metrics, get_view_name
+from .metrics import observe_request
+from .profiling import StackSampler, save_profile, should_profile
+
+logger = logging.getLogger(__name__)
+
+
+class RequestInstrumentationMiddleware:
+    def __init__(self, get_response):
+        if not (settings.REQUEST_INSTRUMENTATION or settings.METRICS_ENABLED):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        try:
+            with connection.execute_wrapper(metrics):
+                response = self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        if settings.METRICS_ENABLED:
+            observe_request(
+                metrics.view,
+                request.method,
+                response.status_code,
+                metrics.total,
+                metrics.queries,
+                metrics.timings["db"],
+            )
+        if settings.REQUEST_INSTRUMENTATION:
+            self.report(request, response, metrics)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics = current_metrics.get()
+        if metrics is not None:
+            metrics.view = get_view_name(view_func, request.method)
+
+    def report(self, request, response, metrics):
+        total = metrics.total
+        timings = {
+            name: round(metrics.timings[name] * 1000, 2)
+            for name in ("db", "serializer", "render")
+        }
+        response["Server-Timing"] = ", ".join(
+            [
+                f'db;dur={timings["db"]};desc="{metrics.queries} queries"',
+                f'serializer;dur={timings["serializer"]}',
+                f'render;dur={timings["render"]}',
+                f"total;dur={round(total * 1000, 2)}",
+            ]
+        )
+        over_budget = metrics.queries > settings.REQUEST_QUERY_BUDGET
+        record = {
+            "view": metrics.view,
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "queries": metrics.queries,
+            "db_ms": timings["db"],
+            "serializer_ms": timings["serializer"],
+            "render_ms": timings["render"],
+            "total_ms": round(total * 1000, 2),
+            "over_query_budget": over_budget,
+        }
+        logger.log(
+            logging.WARNING if over_budget else logging.INFO,
+            json.dumps(record, ensure_ascii=False),
+        )
+
+
+class ProfilingMiddleware:
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        sampler = getattr(request, "_profiling_sampler", None)
+        if sampler is not None:
+            save_profile(request._profiling_view, sampler.stop())
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view = get_view_name(view_func, request.method)
+        if should_profile(view):
+            request._profiling_view = view
+            request._profiling_sampler = StackSampler(
+                threading.get_ident(),
+                self.__call__.__code__,
+                settings.PROFILING_INTERVAL,
+            )
+            request._profiling_sampler.start()
@@ -0,0 +1,28 @@
+# Generated by Django 3.2.3 on 2026-10-19 09:45
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProfilingRule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('view', models.CharField(blank=True, help_text='Например, RecipeViewSet.download_shopping_cart. Пустое значение — все запросы.', max_length=128, verbose_name='View')),
+                ('sample_rate', models.FloatField(default=1.0, validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(1)], verbose_name='Доля профилируемых запросов')),
+                ('is_active', models.BooleanField(default=True, verbose_name='Включено')),
+            ],
+            options={
+                'verbose_name': 'правило профилирования',
+                'verbose_name_plural': 'Правила профилирования',
+            },
+        ),
+    ]
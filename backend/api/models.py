@@ -0,0 +1,80 @@
+from django.core.validators import MaxValueValidator, MinValueValidator
+from django.db import models
+
+import const
+from users.models import User
+
+
+class ProfilingRule(models.Model):
+    view = models.CharField(
+        max_length=const.MAX_LENGTH_PROFILING_VIEW,
+        blank=True,
+        verbose_name="View",
+        help_text=(
+            "Например, RecipeViewSet.download_shopping_cart. "
+            "Пустое значение — все запросы."
+        ),
+    )
+    sample_rate = models.FloatField(
+        default=1.0,
+        validators=[MinValueValidator(0), MaxValueValidator(1)],
+        verbose_name="Доля профилируемых запросов",
+    )
+    is_active = models.BooleanField(default=True, verbose_name="Включено")
+
+    class Meta:
+        verbose_name = "правило профилирования"
+        verbose_name_plural = "Правила профилирования"
+
+    def __str__(self):
+        return f"{self.view or '*'} ({self.sample_rate:.0%})"
+
+
+class Job(models.Model):
+    class Status(models.TextChoices):
+        PENDING = "pending", "В очереди"
+        RUNNING = "running", "Выполняется"
+        DONE = "done", "Готово"
+        FAILED = "failed", "Ошибка"
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="jobs",
+        verbose_name="Пользователь",
+    )
+    kind = models.CharField(
+        max_length=const.MAX_LENGTH_JOB_KIND, verbose_name="Тип задачи"
+    )
+    status = models.CharField(
+        max_length=const.MAX_LENGTH_JOB_STATUS,
+        choices=Status.choices,
+        default=Status.PENDING,
+        db_index=True,
+        verbose_name="Статус",
+    )
+    filename = models.CharField(
+        max_length=const.MAX_LENGTH_JOB_FILENAME,
+        blank=True,
+        verbose_name="Имя файла",
+    )
+    content_type = models.CharField(
+        max_length=const.MAX_LENGTH_JOB_CONTENT_TYPE,
+        blank=True,
+        verbose_name="Тип содержимого",
+    )
+    result = models.BinaryField(null=True, verbose_name="Результат")
+    error = models.TextField(blank=True, verbose_name="Ошибка")
+    created_at = models.DateTimeField(
+        auto_now_add=True, verbose_name="Создана"
+    )
+    started_at = models.DateTimeField(null=True, verbose_name="Начата")
+    finished_at = models.DateTimeField(null=True, verbose_name="Завершена")
+
+    class Meta:
+        ordering = ("created_at",)
+        verbose_name = "фоновая задача"
+        verbose_name_plural = "Фоновые задачи"
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.status})"
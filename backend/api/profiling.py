@@ -0,0 +1,80 @@
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+
+from .cache import profiling_cache
+from .models import ProfilingRule
+
+PROFILE_SUFFIX = ".collapsed"
+
+
+def get_rules():
+    return profiling_cache.get_or_set(
+        "rules",
+        lambda: list(
+            ProfilingRule.objects.filter(is_active=True).values_list(
+                "view", "sample_rate"
+            )
+        ),
+    )
+
+
+def should_profile(view):
+    return any(
+        rule_view in ("", view) and random.random() < sample_rate
+        for rule_view, sample_rate in get_rules()
+    )
+
+
+def frame_label(frame):
+    module = frame.f_globals.get("__name__", "?")
+    code = frame.f_code
+    return f"{module}.{getattr(code, 'co_qualname', code.co_name)}"
+
+
+def collapse_stack(frame, root_code):
+    labels = []
+    while frame is not None and frame.f_code is not root_code:
+        labels.append(frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class StackSampler(threading.Thread):
+    def __init__(self, thread_id, root_code, interval):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.root_code = root_code
+        self.interval = interval
+        self.stacks = Counter()
+        self.finished = threading.Event()
+
+    def run(self):
+        while not self.finished.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[collapse_stack(frame, self.root_code)] += 1
+
+    def stop(self):
+        self.finished.set()
+        self.join()
+        return self.stacks
+
+
+def save_profile(view, stacks):
+    directory = settings.PROFILING_DIR
+    directory.mkdir(parents=True, exist_ok=True)
+    name = re.sub(r"[^\w.-]", "_", view or "unresolved")
+    path = directory / (
+        f"{name}.{int(time.time() * 1000)}.{os.getpid()}{PROFILE_SUFFIX}"
+    )
+    path.write_text(
+        "".join(f"{stack} {count}\n" for stack, count in stacks.items())
+    )
+    return path
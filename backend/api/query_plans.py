@@ -0,0 +1,109 @@
+import re
+
+from django.db import connection, transaction
+
+from .cache import bypass_caches
+
+HOT_QUERIES = {
+    "recipes.list": ("/api/recipes/", {"limit": 6}, False),
+    "recipes.list.authorized": ("/api/recipes/", {"limit": 6}, True),
+    "recipes.is_favorited": (
+        "/api/recipes/",
+        {"limit": 6, "is_favorited": 1},
+        True,
+    ),
+    "recipes.is_in_shopping_cart": (
+        "/api/recipes/",
+        {"limit": 6, "is_in_shopping_cart": 1},
+        True,
+    ),
+    "recipes.author": (
+        "/api/recipes/",
+        {"limit": 6, "author": "{author}", "expand": "author"},
+        True,
+    ),
+    "recipes.detail": ("/api/recipes/{recipe}/", {}, True),
+    "recipes.shopping_cart_summary": (
+        "/api/recipes/shopping_cart_summary/",
+        {},
+        True,
+    ),
+    "users.detail": ("/api/users/{author}/", {}, True),
+    "users.subscriptions": (
+        "/api/users/subscriptions/",
+        {"limit": 6, "recipes_limit": 3},
+        True,
+    ),
+    "ingredients.name": ("/api/ingredients/", {"name": "мо"}, False),
+    "ingredients.search": ("/api/ingredients/", {"search": "молоко"}, False),
+}
+SQLITE_SCANS = {
+    "recipes.list": ("food_recipe",),
+    "recipes.list.authorized": ("food_recipe",),
+    "ingredients.name": ("food_ingredient",),
+    "ingredients.search": ("food_ingredient",),
+}
+SQLITE_SCAN = re.compile(r"^SCAN (\w+)(?!.*\bINDEX\b)")
+ALIAS = re.compile(r'"(\w+)" (U\d+)\b')
+
+
+def get_postgresql_scans(sql, params):
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute("SET LOCAL enable_seqscan = off")
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plans = [cursor.fetchone()[0][0]["Plan"]]
+    scans = []
+    while plans:
+        plan = plans.pop()
+        if plan["Node Type"] == "Seq Scan":
+            scans.append(plan["Relation Name"])
+        plans.extend(plan.get("Plans", ()))
+    return scans
+
+
+def get_sqlite_scans(sql, params):
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+        details = [row[-1] for row in cursor.fetchall()]
+    aliases = {alias: table for table, alias in ALIAS.findall(sql)}
+    tables = set(connection.introspection.table_names())
+    return [
+        aliases.get(match.group(1), match.group(1))
+        for match in map(SQLITE_SCAN.match, details)
+        if match and aliases.get(match.group(1), match.group(1)) in tables
+    ]
+
+
+SCANNERS = {
+    "postgresql": get_postgresql_scans,
+    "sqlite": get_sqlite_scans,
+}
+
+
+def explain_hot_query(client, name, context, allowed=()):
+    path, params, _ = HOT_QUERIES[name]
+    queries = []
+
+    def capture(execute, sql, sql_params, many, execute_context):
+        if sql.lstrip().upper().startswith("SELECT"):
+            queries.append((sql, sql_params))
+        return execute(sql, sql_params, many, execute_context)
+
+    with bypass_caches(), connection.execute_wrapper(capture):
+        response = client.get(
+            path.format(**context),
+            {
+                key: str(value).format(**context)
+                for key, value in params.items()
+            },
+        )
+    allowed = set(allowed)
+    if connection.vendor == "sqlite":
+        allowed.update(SQLITE_SCANS.get(name, ()))
+    get_scans = SCANNERS[connection.vendor]
+    scans = []
+    for sql, sql_params in queries:
+        tables = set(get_scans(sql, sql_params)) - allowed
+        if tables:
+            scans.append((sql, tables))
+    return response, len(queries), scans
@@ -1,13 +1,19 @@
 from django.db import transaction
+from django.urls import reverse
 from djoser.serializers import UserCreateSerializer, UserSerializer
-from drf_extra_fields.fields import Base64ImageField
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 
 import const
-from food.models import Ingredient, IngredientRecipe, Recipe
+from food.models import Ingredient, IngredientRecipe, Purchase, Recipe
+from food.shopping_list import add_purchases, remove_purchases
 from users.models import User
 
+from .fields import Base64ImageField
+from .fieldsets import SparseFieldsetMixin
+from .jobs import JOB_HANDLERS
+from .models import Job
+
 
 class CustomUserCreateSerializer(UserCreateSerializer):
     class Meta:
@@ -17,7 +23,7 @@ class CustomUserCreateSerializer(UserCreateSerializer):
         )
 
 
-class CustomUserSerializer(UserSerializer):
+class CustomUserSerializer(SparseFieldsetMixin, UserSerializer):
     avatar = Base64ImageField(required=False, allow_null=True)
     is_subscribed = serializers.SerializerMethodField(read_only=True)
 
@@ -34,6 +40,8 @@ class CustomUserSerializer(UserSerializer):
         )
 
     def get_is_subscribed(self, obj):
+        if hasattr(obj, "is_subscribed"):
+            return obj.is_subscribed
         request = self.context.get("request")
         return request.user.is_authenticated and (
             request.user.subscriptions.filter(id=obj.id).exists()
@@ -42,9 +50,7 @@ class CustomUserSerializer(UserSerializer):
 
 class UserWithRecipesSerializer(CustomUserSerializer):
     recipes = serializers.SerializerMethodField(read_only=True)
-    recipes_count = serializers.IntegerField(
-        source="recipes.count", read_only=True
-    )
+    recipes_count = serializers.SerializerMethodField(read_only=True)
 
     class Meta(CustomUserSerializer.Meta):
         fields = (
@@ -63,6 +69,11 @@ class UserWithRecipesSerializer(CustomUserSerializer):
             obj.recipes.all()[:recipes_limit], many=True
         ).data
 
+    def get_recipes_count(self, obj):
+        if hasattr(obj, "recipes_count"):
+            return obj.recipes_count
+        return obj.recipes.count()
+
 
 class UserAvatarSerializer(CustomUserSerializer):
     avatar = Base64ImageField(required=True, allow_null=True)
@@ -101,7 +112,7 @@ class RecipeShortSerializer(serializers.ModelSerializer):
         read_only_fields = fields
 
 
-class RecipeSerializer(serializers.ModelSerializer):
+class RecipeSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     image = Base64ImageField()
     author = CustomUserSerializer(read_only=True)
     ingredients = IngredientRecipeSerializer(
@@ -125,6 +136,10 @@ class RecipeSerializer(serializers.ModelSerializer):
         )
         read_only_fields = ("author", "is_favorited", "is_in_shopping_cart")
 
+    expandable_fields = {
+        "author": lambda: serializers.PrimaryKeyRelatedField(read_only=True),
+    }
+
     def validate_image(self, value):
         if not value:
             raise ValidationError(
@@ -156,17 +171,28 @@ class RecipeSerializer(serializers.ModelSerializer):
                     )
         return data
 
-    def _get_exists_relation_with_user(self, recipe, related_name):
+    def _get_exists_relation_with_user(self, recipe, related_name, field_name):
+        if hasattr(recipe, field_name):
+            return getattr(recipe, field_name)
         request = self.context.get("request")
         return request.user.is_authenticated and (
             getattr(request.user, related_name).filter(id=recipe.id).exists()
         )
 
     def get_is_favorited(self, obj):
-        return self._get_exists_relation_with_user(obj, "favorite_recipes")
+        return self._get_exists_relation_with_user(
+            obj, "favorite_recipes", "is_favorited"
+        )
 
     def get_is_in_shopping_cart(self, obj):
-        return self._get_exists_relation_with_user(obj, "purchased_recipes")
+        return self._get_exists_relation_with_user(
+            obj, "purchased_recipes", "is_in_shopping_cart"
+        )
+
+    def to_representation(self, instance):
+        if hasattr(instance, "is_author_subscribed"):
+            instance.author.is_subscribed = instance.is_author_subscribed
+        return super().to_representation(instance)
 
     def _create_ingredient_recipes(self, recipe, ingredient_recipes_data):
         IngredientRecipe.objects.bulk_create(
@@ -186,12 +212,77 @@ class RecipeSerializer(serializers.ModelSerializer):
     @transaction.atomic
     def update(self, instance, validated_data):
         ingredient_recipes_data = validated_data.pop("ingredient_recipes")
+        purchases = Purchase.objects.filter(recipe=instance)
+        remove_purchases(purchases)
         instance.ingredient_recipes.all().delete()
         self._create_ingredient_recipes(instance, ingredient_recipes_data)
+        add_purchases(purchases)
         return super().update(instance, validated_data)
 
 
+class IngredientDumpSerializer(serializers.ModelSerializer):
+    name = serializers.CharField(
+        source="ingredient", max_length=const.MAX_LENGTH_INGREDIENT_NAME
+    )
+
+    class Meta:
+        model = IngredientRecipe
+        fields = ("name", "amount")
+
+
+class RecipeDumpSerializer(serializers.ModelSerializer):
+    image = serializers.CharField()
+    ingredients = IngredientDumpSerializer(many=True, allow_empty=False)
+
+    class Meta:
+        model = Recipe
+        fields = ("name", "text", "image", "cooking_time", "ingredients")
+
+    validate_ingredients = RecipeSerializer.validate_ingredients
+
+
 class IngredientSerializer(serializers.ModelSerializer):
     class Meta:
         model = Ingredient
-        fields = "__all__"
+        fields = ("id", "name", "measurement_unit")
+
+
+class ServingsSerializer(serializers.Serializer):
+    servings = serializers.IntegerField(
+        min_value=const.MIN_SERVINGS,
+        max_value=const.MAX_SERVINGS,
+        default=const.MIN_SERVINGS,
+    )
+
+
+class BatchIdsSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=const.MAX_BATCH_SIZE,
+    )
+
+
+class JobSerializer(serializers.ModelSerializer):
+    kind = serializers.ChoiceField(choices=sorted(JOB_HANDLERS))
+    download = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Job
+        fields = (
+            "id",
+            "kind",
+            "status",
+            "error",
+            "created_at",
+            "finished_at",
+            "download",
+        )
+        read_only_fields = ("status", "error", "created_at", "finished_at")
+
+    def get_download(self, obj):
+        if obj.status != Job.Status.DONE:
+            return None
+        return self.context["request"].build_absolute_uri(
+            reverse("api:jobs-download", args=[obj.pk])
+        )
@@ -0,0 +1,65 @@
+from django.db.models.signals import (post_delete, post_save, pre_delete,
+                                      pre_save)
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from food.models import Ingredient, Purchase, Recipe
+from food.shopping_list import rebuild_ingredient_rows, remove_purchases
+from users.models import User
+
+from .cache import (ingredients_cache, profiling_cache, recipes_cache,
+                    tokens_cache)
+from .models import ProfilingRule
+
+
+@receiver((post_save, post_delete), sender=Ingredient)
+def clear_ingredients_cache(**kwargs):
+    ingredients_cache.clear()
+
+
+@receiver(pre_save, sender=Ingredient)
+def remember_ingredient_base_unit(instance, raw, **kwargs):
+    instance.previous_base_unit = (
+        None
+        if raw or instance.pk is None
+        else Ingredient.objects.filter(pk=instance.pk).values_list(
+            "base_unit", "base_unit_factor"
+        ).first()
+    )
+
+
+@receiver(post_save, sender=Ingredient)
+def rebuild_ingredient_shopping_lists(instance, **kwargs):
+    previous = getattr(instance, "previous_base_unit", None)
+    if previous is not None and previous != (
+        instance.base_unit, instance.base_unit_factor
+    ):
+        rebuild_ingredient_rows(instance.pk)
+
+
+@receiver(pre_delete, sender=Recipe)
+def remove_deleted_recipe_purchases(instance, **kwargs):
+    remove_purchases(Purchase.objects.filter(recipe=instance))
+
+
+@receiver(post_delete, sender=Recipe)
+def forget_deleted_recipe(instance, **kwargs):
+    recipes_cache.delete(("exists", instance.pk))
+
+
+@receiver((post_save, post_delete), sender=ProfilingRule)
+def clear_profiling_cache(**kwargs):
+    profiling_cache.clear()
+
+
+@receiver(post_delete, sender=Token)
+def forget_deleted_token(instance, **kwargs):
+    tokens_cache.delete(instance.key)
+
+
+@receiver(post_save, sender=User)
+def forget_user_tokens(instance, **kwargs):
+    for key in Token.objects.filter(user=instance).values_list(
+        "key", flat=True
+    ):
+        tokens_cache.delete(key)
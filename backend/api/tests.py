@@ -0,0 +1,585 @@
+import json
+from unittest import skipUnless
+
+from django.contrib import admin
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from food.models import (FavoriteRecipe, Ingredient, IngredientRecipe,
+                         Purchase, Recipe)
+from food.shopping_list import rebuild_shopping_lists
+from foodgram_backend.db import trigram_search
+from users.models import Subscription, User
+
+from .cache import ingredients_cache, recipes_cache, tokens_cache
+from .management.commands.compare_serializers import (CASES, make_view,
+                                                      serialize,
+                                                      serialize_lean)
+from .query_plans import HOT_QUERIES, SCANNERS, explain_hot_query
+
+PASSWORD = "seasoned-carrot-42"
+
+
+def create_user(username, **fields):
+    return User.objects.create_user(
+        username=username,
+        email=f"{username}@example.com",
+        password=PASSWORD,
+        **{"first_name": "Имя", "last_name": "Фамилия", **fields},
+    )
+
+
+class LeanRecipeSerializerTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user("user0")
+        cls.author = create_user("user1", avatar="avatars/user.png")
+        cls.other = create_user("user2")
+        Subscription.objects.create(subscriber=cls.user, author=cls.author)
+        ingredients = [
+            Ingredient.objects.create(
+                name=f"ингредиент {number}", measurement_unit="г"
+            )
+            for number in range(3)
+        ]
+        for number in range(4):
+            recipe = Recipe.objects.create(
+                author=cls.author if number % 2 else cls.other,
+                name=f"рецепт {number}",
+                image=f"recipes/{number}.png",
+                text="Описание",
+                cooking_time=number + 1,
+            )
+            IngredientRecipe.objects.bulk_create(
+                IngredientRecipe(
+                    recipe=recipe, ingredient=ingredient, amount=amount + 1
+                )
+                for amount, ingredient in enumerate(ingredients[number:])
+            )
+            if number < 2:
+                FavoriteRecipe.objects.create(user=cls.user, recipe=recipe)
+            if number > 1:
+                Purchase.objects.create(user=cls.user, recipe=recipe)
+
+    def assert_same_output(self, user):
+        renderer = JSONRenderer()
+        for name, (params, authorized) in CASES.items():
+            if authorized != (user is not None):
+                continue
+            with self.subTest(name):
+                view = make_view(params, user, "testserver")
+                data = serialize(view)
+                self.assertTrue(data)
+                self.assertEqual(
+                    renderer.render(serialize_lean(view)),
+                    renderer.render(data),
+                )
+
+    def test_anonymous(self):
+        self.assert_same_output(None)
+
+    def test_authenticated(self):
+        self.assert_same_output(self.user)
+
+
+class RecipeImportTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = create_user("admin", is_staff=True, is_superuser=True)
+        Ingredient.objects.create(name="соль", measurement_unit="г")
+        Ingredient.objects.create(name="сахар", measurement_unit="г")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def make_line(self, **fields):
+        return json.dumps(
+            {
+                "author": self.admin.email,
+                "name": "Рецепт",
+                "text": "Описание",
+                "image": "recipes/1.png",
+                "cooking_time": 10,
+                "ingredients": [{"name": "соль", "amount": 5}],
+                **fields,
+            },
+            ensure_ascii=False,
+        )
+
+    def post(self, *lines):
+        return self.client.post(
+            "/api/recipes/import/",
+            "\n".join(lines),
+            content_type="application/x-ndjson",
+        )
+
+    def test_invalid_rows_are_reported(self):
+        response = self.post(
+            self.make_line(),
+            self.make_line(cooking_time=0),
+            self.make_line(ingredients=[{"name": "перец", "amount": 1}]),
+            self.make_line(
+                ingredients=[
+                    {"name": "соль", "amount": 1},
+                    {"name": "соль", "amount": 2},
+                ]
+            ),
+            self.make_line(ingredients=[{"name": "сахар", "amount": 0}]),
+            self.make_line(name=""),
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["created"], 1)
+        self.assertEqual(response.data["skipped"], 5)
+        self.assertEqual(
+            [error["line"] for error in response.data["errors"]],
+            [2, 3, 4, 5, 6],
+        )
+        self.assertFalse(Ingredient.objects.filter(name="перец").exists())
+        self.assertEqual(
+            list(
+                IngredientRecipe.objects.values_list(
+                    "ingredient__name", "amount"
+                )
+            ),
+            [("соль", 5)],
+        )
+
+    def test_malformed_dump_saves_nothing(self):
+        response = self.post(self.make_line(), "{")
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Recipe.objects.exists())
+
+
+class TrigramSearchTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for name in (
+            "молоко сгущённое",
+            "мука",
+            "кокосовое молоко",
+            "молоко",
+        ):
+            Ingredient.objects.create(name=name, measurement_unit="г")
+        for username, first_name, last_name in (
+            ("ivanov", "Иван", "Иванов"),
+            ("petrovsky", "Павел", "Петровский"),
+            ("petrov", "Пётр", "Петров"),
+        ):
+            create_user(
+                username, first_name=first_name, last_name=last_name
+            )
+
+    def setUp(self):
+        ingredients_cache.clear()
+
+    def search_names(self, value):
+        return list(
+            trigram_search(
+                Ingredient.objects.all(), ("name",), value
+            ).values_list("name", flat=True)
+        )
+
+    def test_exact_match_ranks_first(self):
+        names = self.search_names("молоко")
+        self.assertEqual(names[0], "молоко")
+        self.assertCountEqual(
+            names, ["молоко", "молоко сгущённое", "кокосовое молоко"]
+        )
+
+    @skipUnless(connection.vendor == "sqlite", "SQLite fallback")
+    def test_sqlite_fallback_ranks_prefix_matches_first(self):
+        self.assertEqual(
+            self.search_names("молоко"),
+            ["молоко", "молоко сгущённое", "кокосовое молоко"],
+        )
+        self.assertEqual(self.search_names("малоко"), [])
+
+    @skipUnless(connection.vendor == "postgresql", "pg_trgm similarity")
+    def test_typo_matches_similar_names(self):
+        self.assertEqual(self.search_names("малоко")[0], "молоко")
+
+    def test_ingredients_search_param(self):
+        response = APIClient().get(
+            "/api/ingredients/", {"search": "молоко"}
+        )
+        self.assertEqual(response.status_code, 200)
+        names = [ingredient["name"] for ingredient in response.data]
+        self.assertEqual(names, self.search_names("молоко"))
+        self.assertNotIn("мука", names)
+
+    def test_admin_search_results(self):
+        request = RequestFactory().get("/admin/")
+        for model, search_term, excluded in (
+            (Ingredient, "молоко", "мука"),
+            (User, "petrov", "ivanov"),
+        ):
+            with self.subTest(model._meta.model_name):
+                queryset, may_have_duplicates = admin.site._registry[
+                    model
+                ].get_search_results(
+                    request, model.objects.all(), search_term
+                )
+                names = [str(obj) for obj in queryset]
+                self.assertFalse(may_have_duplicates)
+                self.assertEqual(names[0], search_term)
+                self.assertNotIn(excluded, names)
+
+
+@skipUnless(connection.vendor in SCANNERS, "EXPLAIN is not supported")
+class HotQueryPlanTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user("user0")
+        cls.author = create_user("user1")
+        Subscription.objects.create(subscriber=cls.user, author=cls.author)
+        ingredients = [
+            Ingredient.objects.create(name=name, measurement_unit="г")
+            for name in ("молоко", "мука")
+        ]
+        for number in range(2):
+            cls.recipe = Recipe.objects.create(
+                author=cls.author,
+                name=f"рецепт {number}",
+                image=f"recipes/{number}.png",
+                text="Описание",
+                cooking_time=number + 1,
+            )
+            for ingredient in ingredients:
+                IngredientRecipe.objects.create(
+                    recipe=cls.recipe, ingredient=ingredient, amount=10
+                )
+        FavoriteRecipe.objects.create(user=cls.user, recipe=cls.recipe)
+        Purchase.objects.create(user=cls.user, recipe=cls.recipe)
+
+    def test_hot_queries_do_not_scan_tables(self):
+        clients = {False: APIClient(), True: APIClient()}
+        clients[True].force_authenticate(self.user)
+        context = {"author": self.author.pk, "recipe": self.recipe.pk}
+        for name, (_, _, authorized) in HOT_QUERIES.items():
+            with self.subTest(name):
+                response, _, scans = explain_hot_query(
+                    clients[authorized], name, context
+                )
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(scans, [])
+
+
+class ShoppingListTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user("user0")
+        cls.author = create_user("user1")
+        cls.admin = create_user("admin", is_staff=True, is_superuser=True)
+        cls.flour, cls.sugar, cls.eggs = (
+            Ingredient.objects.create(name=name, measurement_unit=unit)
+            for name, unit in (("мука", "кг"), ("сахар", "г"), ("яйца", "шт"))
+        )
+        cls.recipes = []
+        for number, amounts in enumerate(
+            (
+                {cls.flour: 1, cls.sugar: 100},
+                {cls.sugar: 50, cls.eggs: 2},
+                {cls.flour: 2},
+            )
+        ):
+            recipe = Recipe.objects.create(
+                author=cls.author,
+                name=f"рецепт {number}",
+                image=f"recipes/{number}.png",
+                text="Описание",
+                cooking_time=10,
+            )
+            for ingredient, amount in amounts.items():
+                IngredientRecipe.objects.create(
+                    recipe=recipe, ingredient=ingredient, amount=amount
+                )
+            cls.recipes.append(recipe)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def cart_url(self, recipe):
+        return f"/api/recipes/{recipe.pk}/shopping_cart/"
+
+    def get_summary(self):
+        response = self.client.get("/api/recipes/shopping_cart_summary/")
+        self.assertEqual(response.status_code, 200)
+        return {
+            item["name"]: (item["measurement_unit"], item["amount"])
+            for item in response.data
+        }
+
+    def assert_summary(self, expected):
+        self.assertEqual(self.get_summary(), expected)
+        rebuild_shopping_lists([self.user.pk])
+        self.assertEqual(self.get_summary(), expected)
+
+    def test_servings_and_units_are_aggregated(self):
+        response = self.client.post(
+            self.cart_url(self.recipes[0]), {"servings": 2}, format="json"
+        )
+        self.assertEqual(response.status_code, 201)
+        self.client.post(self.cart_url(self.recipes[1]))
+        self.assert_summary(
+            {
+                "мука": ("г", 2000),
+                "сахар": ("г", 250),
+                "яйца": ("шт.", 2),
+            }
+        )
+
+    def test_servings_update(self):
+        self.client.post(self.cart_url(self.recipes[0]))
+        response = self.client.patch(
+            self.cart_url(self.recipes[0]), {"servings": 3}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assert_summary({"мука": ("г", 3000), "сахар": ("г", 300)})
+        response = self.client.patch(
+            self.cart_url(self.recipes[1]), {"servings": 3}, format="json"
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_repeated_delete_subtracts_once(self):
+        self.client.post(self.cart_url(self.recipes[0]))
+        self.client.post(self.cart_url(self.recipes[1]))
+        self.assertEqual(
+            self.client.post(self.cart_url(self.recipes[1])).status_code, 400
+        )
+        self.assertEqual(
+            self.client.delete(self.cart_url(self.recipes[0])).status_code,
+            204,
+        )
+        self.assertEqual(
+            self.client.delete(self.cart_url(self.recipes[0])).status_code,
+            400,
+        )
+        self.assert_summary({"сахар": ("г", 50), "яйца": ("шт.", 2)})
+
+    def test_batch_requests(self):
+        ids = [recipe.pk for recipe in self.recipes[:2]] + [
+            self.recipes[-1].pk + 1
+        ]
+        for expected in ("created", "already_exists"):
+            response = self.client.post(
+                "/api/recipes/shopping_cart/batch/", {"ids": ids},
+                format="json",
+            )
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(
+                [result["status"] for result in response.data["results"]],
+                [expected, expected, "not_found"],
+            )
+            self.assert_summary(
+                {
+                    "мука": ("г", 1000),
+                    "сахар": ("г", 150),
+                    "яйца": ("шт.", 2),
+                }
+            )
+        response = self.client.delete(
+            "/api/recipes/shopping_cart/batch/",
+            {"ids": [self.recipes[0].pk, self.recipes[2].pk]},
+            format="json",
+        )
+        self.assertEqual(
+            [result["status"] for result in response.data["results"]],
+            ["deleted", "not_exists"],
+        )
+        self.assert_summary({"сахар": ("г", 50), "яйца": ("шт.", 2)})
+
+    def test_recipe_update_and_delete(self):
+        self.client.post(self.cart_url(self.recipes[0]))
+        self.client.post(self.cart_url(self.recipes[1]))
+        author_client = APIClient()
+        author_client.force_authenticate(self.author)
+        response = author_client.patch(
+            f"/api/recipes/{self.recipes[0].pk}/",
+            {
+                "name": "рецепт",
+                "text": "Описание",
+                "cooking_time": 5,
+                "ingredients": [{"id": self.eggs.pk, "amount": 3}],
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assert_summary({"сахар": ("г", 50), "яйца": ("шт.", 5)})
+        response = author_client.delete(f"/api/recipes/{self.recipes[1].pk}/")
+        self.assertEqual(response.status_code, 204)
+        self.assert_summary({"яйца": ("шт.", 3)})
+
+    def test_ingredient_unit_change(self):
+        self.client.post(self.cart_url(self.recipes[1]))
+        self.sugar.name = "сахарный песок"
+        self.sugar.save()
+        self.assert_summary(
+            {"сахарный песок": ("г", 50), "яйца": ("шт.", 2)}
+        )
+        self.sugar.measurement_unit = "кг"
+        self.sugar.save()
+        self.assert_summary(
+            {"сахарный песок": ("г", 50000), "яйца": ("шт.", 2)}
+        )
+
+    def test_admin_purchase_delete(self):
+        self.client.post(self.cart_url(self.recipes[0]))
+        self.client.post(self.cart_url(self.recipes[1]))
+        self.client.force_login(self.admin)
+        purchase = Purchase.objects.get(recipe=self.recipes[0])
+        response = self.client.post(
+            f"/admin/food/purchase/{purchase.pk}/delete/", {"post": "yes"}
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assert_summary({"сахар": ("г", 50), "яйца": ("шт.", 2)})
+
+
+class ToggleTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user("user0")
+        cls.author = create_user("user1")
+        cls.recipes = [
+            Recipe.objects.create(
+                author=cls.author,
+                name=f"рецепт {number}",
+                image=f"recipes/{number}.png",
+                text="Описание",
+                cooking_time=10,
+            )
+            for number in range(2)
+        ]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def assert_statuses(self, method, url, statuses):
+        for expected in statuses:
+            self.assertEqual(
+                getattr(self.client, method)(url).status_code, expected
+            )
+
+    def test_favorite(self):
+        url = f"/api/recipes/{self.recipes[0].pk}/favorite/"
+        self.assert_statuses("post", url, (201, 400))
+        self.assertTrue(
+            FavoriteRecipe.objects.filter(
+                user=self.user, recipe=self.recipes[0]
+            ).exists()
+        )
+        self.assert_statuses("delete", url, (204, 400))
+        self.assert_statuses("delete", "/api/recipes/0/favorite/", (404,))
+
+    def test_subscribe(self):
+        url = f"/api/users/{self.author.pk}/subscribe/"
+        self.assert_statuses("post", url, (201, 400))
+        self.assert_statuses("delete", url, (204, 400))
+        self.assert_statuses("post", "/api/users/0/subscribe/", (404,))
+
+    def test_cannot_subscribe_to_yourself(self):
+        for user_id in (self.user.pk, f"0{self.user.pk}"):
+            self.assert_statuses(
+                "post", f"/api/users/{user_id}/subscribe/", (400,)
+            )
+        self.assertFalse(Subscription.objects.exists())
+
+    def test_batch_requests(self):
+        ids = [recipe.pk for recipe in self.recipes] + [
+            self.recipes[-1].pk + 1
+        ]
+        response = self.client.post(
+            "/api/recipes/favorite/batch/", {"ids": ids[:1]}, format="json"
+        )
+        self.assertEqual(response.data["results"][0]["status"], "created")
+        response = self.client.post(
+            "/api/recipes/favorite/batch/", {"ids": ids}, format="json"
+        )
+        self.assertEqual(
+            [result["status"] for result in response.data["results"]],
+            ["already_exists", "created", "not_found"],
+        )
+        response = self.client.post(
+            "/api/users/subscribe/batch/",
+            {"ids": [self.user.pk, self.author.pk]},
+            format="json",
+        )
+        self.assertEqual(
+            [result["status"] for result in response.data["results"]],
+            ["invalid", "created"],
+        )
+        response = self.client.delete(
+            "/api/users/subscribe/batch/",
+            {"ids": [self.author.pk]},
+            format="json",
+        )
+        self.assertEqual(response.data["results"][0]["status"], "deleted")
+        self.assertFalse(Subscription.objects.exists())
+
+
+class ShortLinkTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.recipe = Recipe.objects.create(
+            author=create_user("user0"),
+            name="рецепт",
+            image="recipes/0.png",
+            text="Описание",
+            cooking_time=10,
+        )
+
+    def setUp(self):
+        recipes_cache.clear()
+
+    def test_round_trip(self):
+        response = self.client.get(f"/api/recipes/{self.recipe.pk}/get-link/")
+        self.assertEqual(response.status_code, 200)
+        path = response.json()["short-link"].removeprefix("http://testserver")
+        response = self.client.get(path)
+        self.assertEqual(response.status_code, 301)
+        self.assertEqual(response["Location"], f"/recipes/{self.recipe.pk}/")
+        code = path.split("/")[-2]
+        checksum = "b" if code.endswith("a") else "a"
+        response = self.client.get(f"/s/{code[:-1]}{checksum}/")
+        self.assertEqual(response.status_code, 404)
+
+    def test_missing_recipe(self):
+        for pk in (self.recipe.pk + 1, "abc"):
+            response = self.client.get(f"/api/recipes/{pk}/get-link/")
+            self.assertEqual(response.status_code, 404)
+
+
+class TokenCacheTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user("user0")
+
+    def setUp(self):
+        tokens_cache.clear()
+        response = self.client.post(
+            "/api/auth/token/login/",
+            {"email": self.user.email, "password": PASSWORD},
+        )
+        self.headers = {
+            "HTTP_AUTHORIZATION": f"Token {response.json()['auth_token']}"
+        }
+
+    def get_me_status(self):
+        return self.client.get("/api/users/me/", **self.headers).status_code
+
+    def test_logout_invalidates_cached_token(self):
+        self.assertEqual(self.get_me_status(), 200)
+        self.assertEqual(self.get_me_status(), 200)
+        response = self.client.post("/api/auth/token/logout/", **self.headers)
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.get_me_status(), 401)
+
+    def test_deactivation_invalidates_cached_token(self):
+        self.assertEqual(self.get_me_status(), 200)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.get_me_status(), 401)
@@ -1,15 +1,18 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import CustomUserViewSet, IngredientViewSet, RecipeViewSet
+from .views import (CacheStatsView, CustomUserViewSet, IngredientViewSet,
+                    JobViewSet, RecipeViewSet)
 
 app_name = "api"
 router = DefaultRouter()
 router.register("users", CustomUserViewSet, basename="users")
 router.register("recipes", RecipeViewSet, basename="recipes")
 router.register("ingredients", IngredientViewSet, basename="ingredients")
+router.register("jobs", JobViewSet, basename="jobs")
 
 urlpatterns = [
     path("", include(router.urls)),
+    path("cache/stats/", CacheStatsView.as_view(), name="cache-stats"),
     path("auth/", include("djoser.urls.authtoken")),
 ]
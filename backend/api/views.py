@@ -1,65 +1,180 @@
+import hashlib
 import io
 
-from django.conf import settings
-from django.db import models
-from django.http import FileResponse, Http404
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef, Prefetch
+from django.http import FileResponse, Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.decorators import method_decorator
+from django.utils.http import quote_etag
+from django.views.decorators.gzip import gzip_page
 from django_filters.rest_framework import DjangoFilterBackend
 from djoser.views import UserViewSet
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfbase import pdfmetrics, ttfonts
-from reportlab.pdfgen import canvas
-from rest_framework import status, viewsets
+from rest_framework import mixins, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.exceptions import ValidationError
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
-
-from food.models import FavoriteRecipe, Ingredient, Purchase, Recipe
+from rest_framework.views import APIView
+
+from food.models import (FavoriteRecipe, Ingredient, IngredientRecipe,
+                         Purchase, Recipe)
+from food.recipe_dumps import RecipeImporter, export_recipes
+from food.shopping_list import (add_purchases, get_shopping_list,
+                                remove_purchases)
+from food.short_links import encode_short_code
+from foodgram_backend.db import insert_ignore_conflicts
 from users.models import Subscription, User
 
+from .cache import get_cache_stats, ingredients_cache, recipes_cache
+from .exports import SHOPPING_CART_FILENAME, render_shopping_cart_pdf
+from .fieldsets import Fieldset
 from .filters import IngredientFilter, RecipeFilter
+from .instrumentation import timer
+from .lean import LeanRecipeSerializer
+from .models import Job
 from .pagination import CustomPagination
 from .permissions import AuthorOrReadOnly
-from .serializers import (IngredientSerializer, RecipeSerializer,
-                          RecipeShortSerializer, UserAvatarSerializer,
-                          UserWithRecipesSerializer)
-
-font_object = ttfonts.TTFont("Arial", settings.BASE_DIR / "fonts/arialmt.ttf")
-pdfmetrics.registerFont(font_object)
+from .serializers import (BatchIdsSerializer, IngredientSerializer,
+                          JobSerializer, RecipeSerializer,
+                          RecipeShortSerializer, ServingsSerializer,
+                          UserAvatarSerializer, UserWithRecipesSerializer)
 
 
 def create_or_delete_object(
     viewset_object,
     request,
+    queryset,
+    target_id,
     model_class,
-    return_object,
     already_exists_message=None,
     non_exists_message=None,
+    defaults=None,
+    on_create=None,
+    on_delete=None,
     **field_values,
 ):
+    related_objects = model_class.objects.filter(**field_values)
     if request.method == "POST":
-        _, created = model_class.objects.get_or_create(**field_values)
-
-        if not created:
-            raise ValidationError(already_exists_message)
+        return_object = get_object_or_404(queryset, pk=target_id)
+        with transaction.atomic():
+            created_pks = insert_ignore_conflicts(
+                model_class, [{**field_values, **(defaults or {})}]
+            )
+            if not created_pks:
+                raise ValidationError(already_exists_message)
+            if on_create:
+                on_create(model_class.objects.filter(pk__in=created_pks))
 
         return Response(
             viewset_object.get_serializer(return_object).data,
             status=status.HTTP_201_CREATED,
         )
 
-    try:
-        model_class.objects.get(**field_values).delete()
-    except model_class.DoesNotExist:
-        raise ValidationError(non_exists_message)
+    with transaction.atomic():
+        deleted_pks = list(
+            related_objects.select_for_update().values_list("pk", flat=True)
+        )
+        if not deleted_pks:
+            if not queryset.filter(pk=target_id).exists():
+                raise Http404
+            raise ValidationError(non_exists_message)
+        deleted_objects = model_class.objects.filter(pk__in=deleted_pks)
+        if on_delete:
+            on_delete(deleted_objects)
+        deleted_objects.delete()
     return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+def batch_create_or_delete_objects(
+    request,
+    model_class,
+    target_model_class,
+    target_field,
+    excluded_ids=(),
+    on_create=None,
+    on_delete=None,
+    **field_values,
+):
+    serializer = BatchIdsSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    ids = list(dict.fromkeys(serializer.validated_data["ids"]))
+
+    with transaction.atomic():
+        found_ids = set(
+            target_model_class.objects.filter(pk__in=ids).values_list(
+                "pk", flat=True
+            )
+        )
+        if request.method == "POST":
+            changed_objects = model_class.objects.filter(
+                pk__in=insert_ignore_conflicts(
+                    model_class,
+                    [
+                        {**field_values, target_field: target_id}
+                        for target_id in ids
+                        if target_id in found_ids
+                        and target_id not in excluded_ids
+                    ],
+                )
+            )
+            if on_create:
+                on_create(changed_objects)
+            done_status, skipped_status = "created", "already_exists"
+        else:
+            changed_objects = model_class.objects.filter(
+                pk__in=list(
+                    model_class.objects.filter(
+                        **field_values, **{f"{target_field}__in": ids}
+                    ).select_for_update().values_list("pk", flat=True)
+                )
+            )
+            if on_delete:
+                on_delete(changed_objects)
+            done_status, skipped_status = "deleted", "not_exists"
+        changed_ids = set(
+            changed_objects.values_list(target_field, flat=True)
+        )
+        if request.method == "DELETE":
+            changed_objects.delete()
+
+    results = []
+    for target_id in ids:
+        if target_id not in found_ids:
+            result = "not_found"
+        elif target_id in excluded_ids:
+            result = "invalid"
+        elif target_id in changed_ids:
+            result = done_status
+        else:
+            result = skipped_status
+        results.append({"id": target_id, "status": result})
+    return Response({"results": results}, status=status.HTTP_200_OK)
+
+
+def subscribed_to(user, author_field="pk"):
+    return Exists(
+        Subscription.objects.filter(
+            subscriber=user.pk, author=OuterRef(author_field)
+        )
+    )
+
+
 class CustomUserViewSet(UserViewSet):
     pagination_class = CustomPagination
 
+    def annotate_users(self, queryset):
+        fieldset = Fieldset(self.request)
+        user = self.request.user
+        if fieldset.is_requested("is_subscribed") and user.is_authenticated:
+            queryset = queryset.annotate(is_subscribed=subscribed_to(user))
+        return queryset
+
+    def get_queryset(self):
+        return self.annotate_users(super().get_queryset())
+
     def get_permissions(self):
         if self.action == "me":
             self.permission_classes = [IsAuthenticated]
@@ -93,7 +208,11 @@ class CustomUserViewSet(UserViewSet):
         serializer_class=UserWithRecipesSerializer,
     )
     def subscriptions(self, request):
-        subscriptions = request.user.subscriptions.all()
+        subscriptions = self.annotate_users(request.user.subscriptions.all())
+        if Fieldset(request).is_requested("recipes_count"):
+            subscriptions = subscriptions.annotate(
+                recipes_count=Count("recipes")
+            )
         paginated_subscriptions = self.paginate_queryset(subscriptions)
         serializer = self.get_serializer(paginated_subscriptions, many=True)
         return self.get_paginated_response(serializer.data)
@@ -107,20 +226,39 @@ class CustomUserViewSet(UserViewSet):
     def subscribe(self, request, id=None):
         author = get_object_or_404(User, pk=id)
         current_user = request.user
-        if current_user == author:
+        if author.pk == current_user.pk:
             raise ValidationError("Cannot subscribe to yourself.")
         return create_or_delete_object(
             self,
             request,
+            User.objects.all(),
+            author.pk,
             Subscription,
-            author,
             "You are already subscribed to this user.",
             "You are not subscribed to this user.",
-            author=author,
-            subscriber=current_user,
+            author_id=author.pk,
+            subscriber_id=current_user.pk,
+        )
+
+    @action(
+        methods=["post", "delete"],
+        detail=False,
+        url_path="subscribe/batch",
+        permission_classes=(IsAuthenticated,),
+    )
+    def subscribe_batch(self, request):
+        return batch_create_or_delete_objects(
+            request,
+            Subscription,
+            User,
+            "author_id",
+            excluded_ids={request.user.pk},
+            subscriber_id=request.user.pk,
         )
 
 
+@method_decorator(gzip_page, name="list")
+@method_decorator(gzip_page, name="retrieve")
 class RecipeViewSet(viewsets.ModelViewSet):
     queryset = Recipe.objects.all()
     filter_backends = (DjangoFilterBackend,)
@@ -129,31 +267,56 @@ class RecipeViewSet(viewsets.ModelViewSet):
     serializer_class = RecipeSerializer
     pagination_class = CustomPagination
 
-    def perform_create(self, serializer):
-        serializer.save(author=self.request.user)
-
-    def _create_or_delete_relation(
-        self, request, recipe_id, model_class, already_exists_message
-    ):
-        recipe = get_object_or_404(Recipe, pk=recipe_id)
-        current_user = request.user
-
-        if request.method == "POST":
-            _, created = model_class.objects.get_or_create(
-                user=current_user, recipe=recipe
-            )
-
-            if not created:
-                raise ValidationError(already_exists_message)
-
-            return Response(
-                self.get_serializer(
-                    recipe).data, status=status.HTTP_201_CREATED
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fieldset = Fieldset(self.request)
+        user = self.request.user
+        if fieldset.is_expanded("author"):
+            queryset = queryset.select_related("author")
+            if user.is_authenticated:
+                queryset = queryset.annotate(
+                    is_author_subscribed=subscribed_to(user, "author")
+                )
+        if fieldset.is_requested("ingredients"):
+            queryset = queryset.prefetch_related(
+                Prefetch(
+                    "ingredient_recipes",
+                    queryset=IngredientRecipe.objects.select_related(
+                        "ingredient"
+                    ).order_by("pk"),
+                )
             )
+        if user.is_authenticated:
+            for field_name, model_class in (
+                ("is_favorited", FavoriteRecipe),
+                ("is_in_shopping_cart", Purchase),
+            ):
+                if fieldset.is_requested(field_name):
+                    queryset = queryset.annotate(
+                        **{
+                            field_name: Exists(
+                                model_class.objects.filter(
+                                    user=user.pk, recipe=OuterRef("pk")
+                                )
+                            )
+                        }
+                    )
+        if not fieldset.is_requested("text"):
+            queryset = queryset.defer("text")
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        serializer = LeanRecipeSerializer(request)
+        queryset = serializer.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        with timer("serializer"):
+            data = serializer.represent(queryset if page is None else page)
+        if page is None:
+            return Response(data)
+        return self.get_paginated_response(data)
 
-        get_object_or_404(model_class, user=current_user,
-                          recipe=recipe).delete()
-        return Response(status=status.HTTP_204_NO_CONTENT)
+    def perform_create(self, serializer):
+        serializer.save(author=self.request.user)
 
     @action(
         detail=True,
@@ -162,97 +325,247 @@ class RecipeViewSet(viewsets.ModelViewSet):
         serializer_class=RecipeShortSerializer,
     )
     def favorite(self, request, pk=None):
-        recipe = get_object_or_404(Recipe, pk=pk)
-        current_user = request.user
         return create_or_delete_object(
             self,
             request,
+            Recipe.objects.only(*RecipeShortSerializer.Meta.fields),
+            pk,
             FavoriteRecipe,
-            recipe,
             "Recipe already is favorited.",
             "Recipe is not favorited.",
-            user=current_user,
-            recipe=recipe,
+            user_id=request.user.pk,
+            recipe_id=pk,
         )
 
     @action(
         detail=True,
-        methods=["post", "delete"],
+        methods=["post", "patch", "delete"],
         permission_classes=[IsAuthenticated],
         serializer_class=RecipeShortSerializer,
     )
     def shopping_cart(self, request, pk=None):
-        recipe = get_object_or_404(Recipe, pk=pk)
-        current_user = request.user
-        return create_or_delete_object(
-            self,
+        recipes = Recipe.objects.only(*RecipeShortSerializer.Meta.fields)
+        if request.method == "DELETE":
+            return create_or_delete_object(
+                self,
+                request,
+                recipes,
+                pk,
+                Purchase,
+                non_exists_message="Recipe is not in shopping cart.",
+                on_delete=remove_purchases,
+                user_id=request.user.pk,
+                recipe_id=pk,
+            )
+
+        serializer = ServingsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        servings = serializer.validated_data["servings"]
+        if request.method == "POST":
+            return create_or_delete_object(
+                self,
+                request,
+                recipes,
+                pk,
+                Purchase,
+                "Recipe already in shopping cart.",
+                defaults={"servings": servings},
+                on_create=add_purchases,
+                user_id=request.user.pk,
+                recipe_id=pk,
+            )
+
+        recipe = get_object_or_404(recipes, pk=pk)
+        purchases = Purchase.objects.filter(user=request.user, recipe=recipe)
+        with transaction.atomic():
+            if not purchases.select_for_update().values_list("pk"):
+                raise ValidationError("Recipe is not in shopping cart.")
+            remove_purchases(purchases)
+            purchases.update(servings=servings)
+            add_purchases(purchases)
+        return Response(self.get_serializer(recipe).data)
+
+    @action(
+        detail=False,
+        methods=["post", "delete"],
+        url_path="favorite/batch",
+        permission_classes=[IsAuthenticated],
+    )
+    def favorite_batch(self, request):
+        return batch_create_or_delete_objects(
+            request,
+            FavoriteRecipe,
+            Recipe,
+            "recipe_id",
+            user_id=request.user.pk,
+        )
+
+    @action(
+        detail=False,
+        methods=["post", "delete"],
+        url_path="shopping_cart/batch",
+        permission_classes=[IsAuthenticated],
+    )
+    def shopping_cart_batch(self, request):
+        return batch_create_or_delete_objects(
             request,
             Purchase,
-            recipe,
-            "Recipe already in shopping cart.",
-            "Recipe is not in shopping cart.",
-            user=current_user,
-            recipe=recipe,
+            Recipe,
+            "recipe_id",
+            on_create=add_purchases,
+            on_delete=remove_purchases,
+            user_id=request.user.pk,
         )
 
     @action(detail=True, methods=["get"], url_path="get-link")
     def get_link_to_recipe(self, request, pk=None):
-        if not Recipe.objects.filter(pk=pk).exists():
+        if not pk.isdigit():
             raise Http404
+        pk = int(pk)
+        if not recipes_cache.get(("exists", pk)):
+            if not Recipe.objects.filter(pk=pk).exists():
+                raise Http404
+            recipes_cache.set(("exists", pk), True)
 
         return Response(
             {
                 "short-link": request.build_absolute_uri(
-                    reverse("food:short-link-to-recipe", args=[pk])
+                    reverse(
+                        "food:short-link-to-recipe",
+                        args=[encode_short_code(pk)],
+                    )
                 )
             },
             status=status.HTTP_200_OK,
         )
 
+    @action(
+        detail=False, permission_classes=[IsAuthenticated], methods=["get"]
+    )
+    def shopping_cart_summary(self, request):
+        ingredients = get_shopping_list(request.user)
+        etag = quote_etag(
+            hashlib.md5(repr(ingredients).encode()).hexdigest()
+        )
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = Response(ingredients)
+        response["ETag"] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
     @action(detail=False, permission_classes=[IsAuthenticated], methods=["get"])
     def download_shopping_cart(self, request):
-        recipes = request.user.purchased_recipes
-        if not recipes.exists():
+        ingredients = get_shopping_list(request.user)
+        if not ingredients:
             raise ValidationError("Shopping list empty")
 
-        ingredients = recipes.values(
-            "ingredients__name", "ingredients__measurement_unit"
-        ).annotate(total_amount=models.Sum("ingredient_recipes__amount"))
-
-        buffer = io.BytesIO()
-        p = canvas.Canvas(buffer, bottomup=0, pagesize=A4)
-        height = A4[1]
-        p.setFont("Arial", 14)
-        y = 50
-        p.drawString(50, y, "Список ингредиентов:")
-        y += 20
-        for i, ingredient in enumerate(ingredients, 1):
-            p.drawString(
-                70,
-                y,
-                f"{i}. {ingredient['ingredients__name']}"
-                f" ({ingredient['ingredients__measurement_unit']})"
-                f" - {ingredient['total_amount']}",
-            )
-            y += 20
-            if y > height - 50:
-                p.showPage()
-                p.setFont("Arial", 14)
-                y = 50
-
-        p.showPage()
-        p.save()
-
-        buffer.seek(0)
         return FileResponse(
-            buffer,
+            io.BytesIO(render_shopping_cart_pdf(ingredients)),
             as_attachment=True,
-            filename="shopping_cart.pdf",
+            filename=SHOPPING_CART_FILENAME,
         )
 
+    @action(detail=False, permission_classes=[IsAdminUser], methods=["get"])
+    def export(self, request):
+        return StreamingHttpResponse(
+            export_recipes(), content_type="application/x-ndjson"
+        )
 
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="import",
+        permission_classes=[IsAdminUser],
+    )
+    def import_recipes(self, request):
+        try:
+            result = RecipeImporter(
+                request.query_params.get("default_author")
+            ).import_lines(request.stream or ())
+        except User.DoesNotExist:
+            raise ValidationError("Default author not found.")
+        except (ValueError, TypeError) as error:
+            raise ValidationError(f"Invalid dump: {error}")
+        return Response(result, status=status.HTTP_201_CREATED)
+
+
+@method_decorator(gzip_page, name="list")
+@method_decorator(gzip_page, name="retrieve")
 class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
     filter_backends = (DjangoFilterBackend,)
     filterset_class = IngredientFilter
+
+    def list(self, request, *args, **kwargs):
+        return Response(
+            ingredients_cache.get_or_set(
+                (
+                    "list",
+                    request.query_params.get("name", ""),
+                    request.query_params.get("search", ""),
+                ),
+                lambda: list(
+                    super(IngredientViewSet, self).list(
+                        request, *args, **kwargs
+                    ).data
+                ),
+            )
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return Response(
+            ingredients_cache.get_or_set(
+                ("detail", kwargs["pk"]),
+                lambda: dict(
+                    super(IngredientViewSet, self).retrieve(
+                        request, *args, **kwargs
+                    ).data
+                ),
+            )
+        )
+
+
+class CacheStatsView(APIView):
+    permission_classes = (IsAdminUser,)
+
+    def get(self, request):
+        return Response(get_cache_stats())
+
+
+class JobViewSet(
+    mixins.CreateModelMixin,
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    viewsets.GenericViewSet,
+):
+    serializer_class = JobSerializer
+    permission_classes = (IsAuthenticated,)
+    pagination_class = CustomPagination
+
+    def get_queryset(self):
+        return self.request.user.jobs.defer("result").order_by("-created_at")
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        job = request.user.jobs.filter(
+            kind=serializer.validated_data["kind"],
+            status__in=(Job.Status.PENDING, Job.Status.RUNNING),
+        ).first() or serializer.save(user=request.user)
+        return Response(
+            self.get_serializer(job).data, status=status.HTTP_202_ACCEPTED
+        )
+
+    @action(detail=True, methods=["get"])
+    def download(self, request, pk=None):
+        job = self.get_object()
+        if job.status != Job.Status.DONE:
+            raise ValidationError("Job is not finished.")
+        return FileResponse(
+            io.BytesIO(job.result),
+            as_attachment=True,
+            filename=job.filename,
+            content_type=job.content_type,
+        )
@@ -12,3 +12,27 @@ MAX_PAGE_SIZE = 100
 
 RECIPES_LIMIT_QUERY_PARAM = "recipes_limit"
 RECIPES_LIMIT_DEFAULT = 100
+
+MAX_LENGTH_PROFILING_VIEW = 128
+
+MAX_LENGTH_JOB_KIND = 64
+MAX_LENGTH_JOB_STATUS = 16
+MAX_LENGTH_JOB_FILENAME = 255
+MAX_LENGTH_JOB_CONTENT_TYPE = 128
+
+MAX_BATCH_SIZE = 100
+
+MIN_SERVINGS = 1
+MAX_SERVINGS = 100
+
+FIELDS_QUERY_PARAM = "fields"
+EXPAND_QUERY_PARAM = "expand"
+
+UNIT_CONVERSIONS = {
+    "кг": ("г", 1000),
+    "л": ("мл", 1000),
+    "ст. л.": ("мл", 15),
+    "ч. л.": ("мл", 5),
+    "стакан": ("мл", 250),
+    "шт": ("шт.", 1),
+}
@@ -1,10 +1,13 @@
 #!/bin/sh
 
-python3 manage.py makemigrations
-python3 manage.py migrate
-python3 manage.py loaddata db.json
+env -u PROMETHEUS_MULTIPROC_DIR python3 manage.py startup \
+    --fixture db.json \
+    --static-target /backend_static/static/ \
+    --state-dir /backend_static/startup/
 
-python3 manage.py collectstatic
-cp -r /app/collected_static/. /backend_static/static/
+if [ -n "$PROMETHEUS_MULTIPROC_DIR" ]; then
+    rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+    mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+fi
 
-gunicorn --bind 0.0.0.0:8000 foodgram_backend.wsgi
\ No newline at end of file
+gunicorn --config gunicorn.conf.py foodgram_backend.wsgi
@@ -1,7 +1,43 @@
 from django.contrib import admin
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from foodgram_backend.db import trigram_search
 
 from .models import (FavoriteRecipe, Ingredient, IngredientRecipe, Purchase,
-                     Recipe)
+                     Recipe, ShoppingListItem)
+from .shopping_list import rebuild_shopping_lists
+
+
+class ShoppingListRebuildMixin:
+    shopping_list_user_field = "user_id"
+
+    def get_shopping_list_user_ids(self, queryset):
+        return set(
+            queryset.filter(
+                **{f"{self.shopping_list_user_field}__isnull": False}
+            ).values_list(self.shopping_list_user_field, flat=True)
+        )
+
+    def get_object_user_ids(self, obj):
+        return self.get_shopping_list_user_ids(
+            self.model.objects.filter(pk=obj.pk)
+        )
+
+    def save_model(self, request, obj, form, change):
+        user_ids = self.get_object_user_ids(obj) if change else set()
+        super().save_model(request, obj, form, change)
+        rebuild_shopping_lists(user_ids | self.get_object_user_ids(obj))
+
+    def delete_model(self, request, obj):
+        user_ids = self.get_object_user_ids(obj)
+        super().delete_model(request, obj)
+        rebuild_shopping_lists(user_ids)
+
+    def delete_queryset(self, request, queryset):
+        user_ids = self.get_shopping_list_user_ids(queryset)
+        super().delete_queryset(request, queryset)
+        rebuild_shopping_lists(user_ids)
 
 
 @admin.register(Recipe)
@@ -9,18 +45,37 @@ class RecipeAdmin(admin.ModelAdmin):
     list_display = (
         "name",
         "author",
+        "lovers_count",
     )
+    list_select_related = ("author",)
     search_fields = (
         "author__username",
         "author__first_name",
         "author__last_name",
         "name",
     )
+    autocomplete_fields = ("author",)
     readonly_fields = ("lovers_count",)
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            lovers_count=Coalesce(
+                Subquery(
+                    FavoriteRecipe.objects.filter(recipe=OuterRef("pk"))
+                    .order_by()
+                    .values("recipe")
+                    .annotate(count=Count("pk"))
+                    .values("count"),
+                    output_field=IntegerField(),
+                ),
+                0,
+            )
+        )
 
     @admin.display(description="Добавления в изобранное")
     def lovers_count(self, obj):
-        return obj.lovers.count()
+        return obj.lovers_count
 
 
 @admin.register(Ingredient)
@@ -30,11 +85,22 @@ class IngredientAdmin(admin.ModelAdmin):
         "measurement_unit",
     )
     search_fields = ("name",)
+    show_full_result_count = False
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return super().get_search_results(request, queryset, search_term)
+        return trigram_search(queryset, self.search_fields, search_term), False
 
 
 @admin.register(IngredientRecipe)
-class IngredientRecipeAdmin(admin.ModelAdmin):
+class IngredientRecipeAdmin(ShoppingListRebuildMixin, admin.ModelAdmin):
     list_display = ("ingredient", "recipe", "amount")
+    list_select_related = ("ingredient", "recipe")
+    autocomplete_fields = ("ingredient",)
+    raw_id_fields = ("recipe",)
+    show_full_result_count = False
+    shopping_list_user_field = "recipe__shoppers"
 
 
 @admin.register(FavoriteRecipe)
@@ -43,11 +109,31 @@ class FavoriteRecipeAdmin(admin.ModelAdmin):
         "user",
         "recipe",
     )
+    list_select_related = ("user", "recipe")
+    autocomplete_fields = ("user",)
+    raw_id_fields = ("recipe",)
+    show_full_result_count = False
 
 
 @admin.register(Purchase)
-class PurchaseAdmin(admin.ModelAdmin):
+class PurchaseAdmin(ShoppingListRebuildMixin, admin.ModelAdmin):
     list_display = (
         "user",
         "recipe",
+        "servings",
     )
+    list_select_related = ("user", "recipe")
+    autocomplete_fields = ("user",)
+    raw_id_fields = ("recipe",)
+    show_full_result_count = False
+
+
+@admin.register(ShoppingListItem)
+class ShoppingListItemAdmin(admin.ModelAdmin):
+    list_display = ("user", "ingredient", "amount")
+    list_select_related = ("user", "ingredient")
+    readonly_fields = ("user", "ingredient", "amount")
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        return False
@@ -0,0 +1,29 @@
+import sys
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from food.recipe_dumps import export_recipes
+
+
+class Command(BaseCommand):
+    help = (
+        "Выгружает рецепты с ингредиентами и путями к картинкам в формате "
+        "JSON Lines, читая базу пачками."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", type=Path, default=None)
+        parser.add_argument("--chunk-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        output = (
+            open(options["output"], "w", encoding="utf-8")
+            if options["output"] else sys.stdout
+        )
+        try:
+            for line in export_recipes(chunk_size=options["chunk_size"]):
+                output.write(line)
+        finally:
+            if options["output"]:
+                output.close()
@@ -0,0 +1,36 @@
+import sys
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+from django.urls import reverse
+
+from food.models import Recipe
+from food.short_links import encode_short_code
+
+
+class Command(BaseCommand):
+    help = (
+        "Выгружает короткие ссылки на рецепты в виде записей map для nginx, "
+        "чтобы редиректы отдавались без обращения к backend."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", type=Path, default=None)
+        parser.add_argument("--chunk-size", type=int, default=10000)
+
+    def handle(self, *args, **options):
+        output = (
+            open(options["output"], "w") if options["output"] else sys.stdout
+        )
+        try:
+            for recipe_id in Recipe.objects.order_by().values_list(
+                "pk", flat=True
+            ).iterator(chunk_size=options["chunk_size"]):
+                short_link = reverse(
+                    "food:short-link-to-recipe",
+                    args=[encode_short_code(recipe_id)],
+                )
+                output.write(f"{short_link} /recipes/{recipe_id}/;\n")
+        finally:
+            if options["output"]:
+                output.close()
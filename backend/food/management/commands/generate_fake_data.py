@@ -0,0 +1,218 @@
+import io
+import random
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from PIL import Image
+
+from food.models import (FavoriteRecipe, Ingredient, IngredientRecipe,
+                         Purchase, Recipe, ShoppingListItem)
+from food.shopping_list import rebuild_shopping_lists
+from users.models import Subscription, User
+
+FAKE_IMAGE = "recipes/fake.png"
+FAKE_TEXT = "Смешать ингредиенты и готовить до готовности. " * 5
+AMOUNT_RANGES = {
+    "г": (10, 1000, 10),
+    "мл": (10, 500, 10),
+}
+DEFAULT_AMOUNT_RANGE = (1, 10, 1)
+
+
+def ensure_fake_image():
+    path = settings.MEDIA_ROOT / FAKE_IMAGE
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        buffer = io.BytesIO()
+        Image.new("RGB", (64, 64), (230, 150, 90)).save(buffer, "PNG")
+        path.write_bytes(buffer.getvalue())
+    return FAKE_IMAGE
+
+
+def new_ids(model, last_id):
+    return list(
+        model.objects.filter(pk__gt=last_id).values_list("pk", flat=True)
+    )
+
+
+def last_id(model):
+    return model.objects.order_by("-pk").values_list("pk", flat=True).first()
+
+
+class Command(BaseCommand):
+    help = (
+        "Заполняет базу синтетическими пользователями, рецептами, "
+        "избранным, корзинами и подписками."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--recipes", type=int, default=5000)
+        parser.add_argument("--favorites-per-user", type=int, default=20)
+        parser.add_argument("--purchases-per-user", type=int, default=5)
+        parser.add_argument("--subscriptions-per-user", type=int, default=10)
+        parser.add_argument("--ingredients-file", default=None)
+        parser.add_argument("--password", default="foodgram-password")
+        parser.add_argument("--seed", type=int, default=None)
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+        if options["ingredients_file"]:
+            call_command(
+                "import_ingredients", options["ingredients_file"], verbosity=0
+            )
+        ingredients = list(
+            Ingredient.objects.values_list("pk", "measurement_unit")
+        )
+        if not ingredients:
+            raise CommandError(
+                "Нет ингредиентов, укажите --ingredients-file."
+            )
+
+        with transaction.atomic():
+            user_ids = self.step(
+                "пользователи",
+                self.create_users, options["users"], options["password"],
+            )
+            recipe_ids = self.step(
+                "рецепты",
+                self.create_recipes, options["recipes"], user_ids, ingredients,
+            )
+            self.step(
+                "избранное", self.create_user_recipes, FavoriteRecipe,
+                user_ids, recipe_ids, options["favorites_per_user"],
+            )
+            self.step(
+                "корзины", self.create_user_recipes, Purchase,
+                user_ids, recipe_ids, options["purchases_per_user"],
+            )
+            self.step(
+                "списки покупок", self.create_shopping_lists, user_ids
+            )
+            self.step(
+                "подписки", self.create_subscriptions,
+                user_ids, options["subscriptions_per_user"],
+            )
+
+    def step(self, name, function, *args):
+        start = time.perf_counter()
+        result = function(*args)
+        self.stdout.write(
+            f"{name}: {len(result)} за {time.perf_counter() - start:.2f} с"
+        )
+        return result
+
+    def create_users(self, count, password):
+        previous_id = last_id(User) or 0
+        password = make_password(password)
+        User.objects.bulk_create(
+            [
+                User(
+                    username=f"fake{previous_id + number}",
+                    email=f"fake{previous_id + number}@example.com",
+                    first_name="Fake",
+                    last_name=str(previous_id + number),
+                    password=password,
+                )
+                for number in range(1, count + 1)
+            ],
+            batch_size=self.batch_size,
+        )
+        return new_ids(User, previous_id)
+
+    def create_recipes(self, count, user_ids, ingredients):
+        previous_id = last_id(Recipe) or 0
+        image = ensure_fake_image()
+        authors = self.random.choices(
+            user_ids,
+            weights=[1 / rank for rank in range(1, len(user_ids) + 1)],
+            k=count,
+        )
+        Recipe.objects.bulk_create(
+            [
+                Recipe(
+                    author_id=author_id,
+                    name=f"Рецепт {previous_id + number}",
+                    text=FAKE_TEXT,
+                    image=image,
+                    cooking_time=self.random.randint(5, 180),
+                )
+                for number, author_id in enumerate(authors, 1)
+            ],
+            batch_size=self.batch_size,
+        )
+        recipe_ids = new_ids(Recipe, previous_id)
+
+        ingredient_weights = [
+            1 / rank for rank in range(1, len(ingredients) + 1)
+        ]
+        shuffled_ingredients = self.random.sample(
+            ingredients, len(ingredients)
+        )
+        ingredient_recipes = []
+        for recipe_id in recipe_ids:
+            chosen = {
+                ingredient
+                for ingredient in self.random.choices(
+                    shuffled_ingredients,
+                    weights=ingredient_weights,
+                    k=self.random.randint(3, 12),
+                )
+            }
+            for ingredient_id, measurement_unit in chosen:
+                start, stop, step = AMOUNT_RANGES.get(
+                    measurement_unit, DEFAULT_AMOUNT_RANGE
+                )
+                ingredient_recipes.append(
+                    IngredientRecipe(
+                        recipe_id=recipe_id,
+                        ingredient_id=ingredient_id,
+                        amount=self.random.randrange(start, stop + 1, step),
+                    )
+                )
+        IngredientRecipe.objects.bulk_create(
+            ingredient_recipes, batch_size=self.batch_size
+        )
+        return recipe_ids
+
+    def create_user_recipes(self, model, user_ids, recipe_ids, per_user):
+        per_user = min(per_user, len(recipe_ids))
+        objects = [
+            model(user_id=user_id, recipe_id=recipe_id)
+            for user_id in user_ids
+            for recipe_id in self.random.sample(recipe_ids, per_user)
+        ]
+        model.objects.bulk_create(
+            objects, batch_size=self.batch_size, ignore_conflicts=True
+        )
+        return objects
+
+    def create_shopping_lists(self, user_ids):
+        rebuild_shopping_lists(user_ids)
+        return ShoppingListItem.objects.filter(
+            user_id__in=user_ids
+        ).values_list("pk", flat=True)
+
+    def create_subscriptions(self, user_ids, per_user):
+        per_user = min(per_user, len(user_ids) - 1)
+        objects = []
+        for user_id in user_ids:
+            authors = [
+                author_id
+                for author_id in self.random.sample(user_ids, per_user + 1)
+                if author_id != user_id
+            ]
+            objects.extend(
+                Subscription(subscriber_id=user_id, author_id=author_id)
+                for author_id in authors[:per_user]
+            )
+        Subscription.objects.bulk_create(
+            objects, batch_size=self.batch_size, ignore_conflicts=True
+        )
+        return objects
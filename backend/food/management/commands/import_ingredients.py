@@ -0,0 +1,164 @@
+import csv
+import io
+import json
+import time
+from itertools import islice
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from api.cache import ingredients_cache
+from food.models import Ingredient
+from food.units import get_base_unit
+
+FIXTURE_MODEL = "food.ingredient"
+
+
+def read_csv(file):
+    for row in csv.reader(file):
+        if len(row) >= 2:
+            yield {"name": row[0], "measurement_unit": row[1]}
+
+
+def read_json(file, chunk_size=64 * 1024):
+    decoder = json.JSONDecoder()
+    buffer = file.read(chunk_size).lstrip()
+    if not buffer.startswith("["):
+        raise CommandError("Ожидался JSON-массив.")
+    buffer = buffer[1:]
+    while True:
+        buffer = buffer.lstrip().removeprefix(",").lstrip()
+        if buffer.startswith("]"):
+            return
+        try:
+            item, end = decoder.raw_decode(buffer)
+        except json.JSONDecodeError:
+            chunk = file.read(chunk_size)
+            if not chunk:
+                raise CommandError("Некорректный JSON.")
+            buffer += chunk
+            continue
+        buffer = buffer[end:]
+        yield item
+
+
+def read_json_lines(file):
+    for line in file:
+        if line.strip():
+            yield json.loads(line)
+
+
+READERS = {
+    ".csv": read_csv,
+    ".json": read_json,
+    ".jsonl": read_json_lines,
+}
+
+
+def read_ingredients(file, reader):
+    for item in reader(file):
+        if "fields" in item:
+            if item.get("model") != FIXTURE_MODEL:
+                continue
+            item = item["fields"]
+        yield item["name"].strip(), item["measurement_unit"].strip()
+
+
+def make_ingredient(name, measurement_unit):
+    base_unit, base_unit_factor = get_base_unit(measurement_unit)
+    return Ingredient(
+        name=name,
+        measurement_unit=measurement_unit,
+        base_unit=base_unit,
+        base_unit_factor=base_unit_factor,
+    )
+
+
+def batches(rows, batch_size):
+    rows = iter(rows)
+    while batch := dict(islice(rows, batch_size)):
+        yield batch
+
+
+class Command(BaseCommand):
+    help = (
+        "Загружает ингредиенты из CSV, JSON или JSON Lines. "
+        "Уже существующие названия пропускаются."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", type=Path)
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--copy",
+            action="store_true",
+            help="Загружать через COPY (только PostgreSQL).",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        reader = READERS.get(path.suffix)
+        if reader is None:
+            raise CommandError(f"Неподдерживаемый формат файла: {path}")
+        if options["copy"] and connection.vendor != "postgresql":
+            raise CommandError("COPY доступен только для PostgreSQL.")
+        load_batch = (
+            self.copy_batch if options["copy"] else self.bulk_create_batch
+        )
+
+        start_time = time.perf_counter()
+        count_before = Ingredient.objects.count()
+        processed = 0
+        with open(path, encoding="utf-8") as file, transaction.atomic():
+            for batch in batches(
+                read_ingredients(file, reader), options["batch_size"]
+            ):
+                load_batch(batch)
+                processed += len(batch)
+        ingredients_cache.clear()
+        created = Ingredient.objects.count() - count_before
+        elapsed = time.perf_counter() - start_time
+
+        if options["verbosity"]:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Обработано: {processed}, добавлено: {created}, "
+                    f"{processed / elapsed:.0f} строк/с"
+                )
+            )
+
+    def bulk_create_batch(self, batch):
+        Ingredient.objects.bulk_create(
+            [
+                make_ingredient(name, measurement_unit)
+                for name, measurement_unit in batch.items()
+            ],
+            ignore_conflicts=True,
+        )
+
+    def copy_batch(self, batch):
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(
+            (name, measurement_unit, *get_base_unit(measurement_unit))
+            for name, measurement_unit in batch.items()
+        )
+        buffer.seek(0)
+        table = Ingredient._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "CREATE TEMP TABLE IF NOT EXISTS ingredient_import "
+                "(name text, measurement_unit text, base_unit text, "
+                "base_unit_factor integer) ON COMMIT DROP"
+            )
+            cursor.copy_expert(
+                "COPY ingredient_import FROM STDIN WITH (FORMAT csv)", buffer
+            )
+            cursor.execute(
+                f"INSERT INTO {table} "
+                "(name, measurement_unit, base_unit, base_unit_factor) "
+                "SELECT name, measurement_unit, base_unit, base_unit_factor "
+                "FROM ingredient_import "
+                "ON CONFLICT (name) DO NOTHING"
+            )
+            cursor.execute("TRUNCATE ingredient_import")
@@ -0,0 +1,52 @@
+import json
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from food.recipe_dumps import RecipeImporter
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Загружает рецепты из JSON Lines, созданного export_recipes. "
+        "Ингредиенты сопоставляются по названию, авторы — по email. "
+        "Строки с неизвестными ингредиентами или ошибками пропускаются."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", type=Path)
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--default-author",
+            default=None,
+            help="Email автора для рецептов с неизвестным автором.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            importer = RecipeImporter(
+                options["default_author"], options["batch_size"]
+            )
+        except User.DoesNotExist:
+            raise CommandError("Автор по умолчанию не найден.")
+        start = time.perf_counter()
+        with open(options["path"], encoding="utf-8") as file:
+            try:
+                result = importer.import_lines(file)
+            except (ValueError, TypeError) as error:
+                raise CommandError(f"Некорректная выгрузка: {error}")
+        for error in result["errors"]:
+            self.stderr.write(
+                f"Строка {error['line']}: "
+                + json.dumps(error["errors"], ensure_ascii=False)
+            )
+        if options["verbosity"]:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Добавлено: {result['created']}, "
+                    f"пропущено: {result['skipped']}, "
+                    f"{time.perf_counter() - start:.2f} с"
+                )
+            )
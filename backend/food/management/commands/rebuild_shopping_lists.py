@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from food.models import ShoppingListItem
+from food.shopping_list import rebuild_shopping_lists
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересобирает материализованные списки покупок по корзинам "
+        "пользователей."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, nargs="+", default=None)
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        rebuild_shopping_lists(options["users"])
+        if options["verbosity"]:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Позиций в списках покупок: "
+                    f"{ShoppingListItem.objects.count()}, "
+                    f"{time.perf_counter() - start:.2f} с"
+                )
+            )
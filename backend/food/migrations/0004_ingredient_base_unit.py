@@ -0,0 +1,51 @@
+from django.db import migrations, models
+
+UNIT_CONVERSIONS = {
+    "кг": ("г", 1000),
+    "л": ("мл", 1000),
+    "ст. л.": ("мл", 15),
+    "ч. л.": ("мл", 5),
+    "стакан": ("мл", 250),
+    "шт": ("шт.", 1),
+}
+
+
+def get_base_unit(measurement_unit):
+    measurement_unit = measurement_unit.strip()
+    return UNIT_CONVERSIONS.get(
+        measurement_unit.lower(), (measurement_unit, 1)
+    )
+
+
+def fill_base_units(apps, schema_editor):
+    Ingredient = apps.get_model("food", "Ingredient")
+    measurement_units = Ingredient.objects.values_list(
+        "measurement_unit", flat=True
+    ).distinct()
+    for measurement_unit in list(measurement_units):
+        base_unit, base_unit_factor = get_base_unit(measurement_unit)
+        Ingredient.objects.filter(measurement_unit=measurement_unit).update(
+            base_unit=base_unit, base_unit_factor=base_unit_factor
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('food', '0003_purchase_servings'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingredient',
+            name='base_unit',
+            field=models.CharField(default='', editable=False, max_length=64, verbose_name='Базовая единица измерения'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='ingredient',
+            name='base_unit_factor',
+            field=models.PositiveIntegerField(default=1, editable=False, verbose_name='Множитель базовой единицы'),
+        ),
+        migrations.RunPython(fill_base_units, migrations.RunPython.noop),
+    ]
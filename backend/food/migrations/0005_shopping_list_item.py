@@ -0,0 +1,64 @@
+# Generated by Django 3.2.3 on 2026-10-19 09:58
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import F, Sum
+from django.db.models.functions import Cast
+
+
+def fill_shopping_lists(apps, schema_editor):
+    Purchase = apps.get_model("food", "Purchase")
+    ShoppingListItem = apps.get_model("food", "ShoppingListItem")
+    ingredient_recipe = "recipe__ingredient_recipes"
+    amounts = Purchase.objects.filter(
+        **{f"{ingredient_recipe}__isnull": False}
+    ).values(
+        "user_id", f"{ingredient_recipe}__ingredient_id"
+    ).annotate(
+        amount=Sum(
+            Cast(f"{ingredient_recipe}__amount", models.BigIntegerField())
+            * F("servings")
+            * F(f"{ingredient_recipe}__ingredient__base_unit_factor")
+        )
+    ).order_by()
+    ShoppingListItem.objects.bulk_create(
+        [
+            ShoppingListItem(
+                user_id=row["user_id"],
+                ingredient_id=row[f"{ingredient_recipe}__ingredient_id"],
+                amount=row["amount"],
+            )
+            for row in amounts.iterator()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('food', '0004_ingredient_base_unit'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ShoppingListItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.BigIntegerField(verbose_name='Количество в базовых единицах')),
+                ('ingredient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='food.ingredient', verbose_name='Ингредиент')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='shopping_list', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'позиция списка покупок',
+                'verbose_name_plural': 'Списки покупок',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='shoppinglistitem',
+            constraint=models.UniqueConstraint(fields=('user', 'ingredient'), name='unique_shopping_list_item'),
+        ),
+        migrations.RunPython(fill_shopping_lists, migrations.RunPython.noop),
+    ]
@@ -1,9 +1,11 @@
-from django.core.validators import MinValueValidator
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 
 import const
 from users.models import User
 
+from .units import get_base_unit
+
 
 class Ingredient(models.Model):
     name = models.CharField(
@@ -16,6 +18,16 @@ class Ingredient(models.Model):
         max_length=const.MAX_LENGTH_MEASUREMENT_UNIT,
         verbose_name="Единица измерения"
     )
+    base_unit = models.CharField(
+        max_length=const.MAX_LENGTH_MEASUREMENT_UNIT,
+        editable=False,
+        verbose_name="Базовая единица измерения",
+    )
+    base_unit_factor = models.PositiveIntegerField(
+        default=1,
+        editable=False,
+        verbose_name="Множитель базовой единицы",
+    )
 
     class Meta:
         verbose_name = "ингредиент"
@@ -24,6 +36,12 @@ class Ingredient(models.Model):
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        self.base_unit, self.base_unit_factor = get_base_unit(
+            self.measurement_unit
+        )
+        super().save(*args, **kwargs)
+
 
 class Recipe(models.Model):
     author = models.ForeignKey(
@@ -67,11 +85,15 @@ class Recipe(models.Model):
 
 class IngredientRecipe(models.Model):
     ingredient = models.ForeignKey(
-        Ingredient, on_delete=models.CASCADE, verbose_name="Ингредиент"
+        Ingredient,
+        on_delete=models.CASCADE,
+        db_index=False,
+        verbose_name="Ингредиент",
     )
     recipe = models.ForeignKey(
         Recipe,
         on_delete=models.CASCADE,
+        db_index=False,
         related_name="ingredient_recipes",
         verbose_name="Рецепт",
     )
@@ -87,6 +109,12 @@ class IngredientRecipe(models.Model):
                 name="unique_ingredient_recipe"
             )
         ]
+        indexes = [
+            models.Index(
+                fields=("recipe", "ingredient", "amount"),
+                name="ingredientrecipe_recipe_idx",
+            )
+        ]
         verbose_name = "ингредиент в рецепте"
         verbose_name_plural = "Ингридиенты в рецептах"
 
@@ -96,12 +124,16 @@ class IngredientRecipe(models.Model):
 
 class UserRecipe(models.Model):
     user = models.ForeignKey(
-        User, on_delete=models.CASCADE, verbose_name="Пользователь"
+        User,
+        on_delete=models.CASCADE,
+        db_index=False,
+        verbose_name="Пользователь",
     )
     recipe = models.ForeignKey(
         Recipe,
         on_delete=models.CASCADE,
-        verbose_name="Рецепт"
+        db_index=False,
+        verbose_name="Рецепт",
     )
 
     class Meta:
@@ -110,6 +142,11 @@ class UserRecipe(models.Model):
             fields=("user", "recipe"),
             name="unique_%(class)s"
         )]
+        indexes = [
+            models.Index(
+                fields=("recipe", "user"), name="%(class)s_recipe_user_idx"
+            )
+        ]
         verbose_name = "рецепт пользователя"
         verbose_name_plural = "Рецепты пользователей"
 
@@ -124,6 +161,43 @@ class FavoriteRecipe(UserRecipe):
 
 
 class Purchase(UserRecipe):
+    servings = models.PositiveSmallIntegerField(
+        default=const.MIN_SERVINGS,
+        validators=[
+            MinValueValidator(const.MIN_SERVINGS),
+            MaxValueValidator(const.MAX_SERVINGS),
+        ],
+        verbose_name="Количество порций",
+    )
+
     class Meta(UserRecipe.Meta):
         verbose_name = "рецепт в корзине"
         verbose_name_plural = "Рецепты в корзине"
+
+
+class ShoppingListItem(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="shopping_list",
+        verbose_name="Пользователь",
+    )
+    ingredient = models.ForeignKey(
+        Ingredient, on_delete=models.CASCADE, verbose_name="Ингредиент"
+    )
+    amount = models.BigIntegerField(
+        verbose_name="Количество в базовых единицах"
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=("user", "ingredient"),
+                name="unique_shopping_list_item"
+            )
+        ]
+        verbose_name = "позиция списка покупок"
+        verbose_name_plural = "Списки покупок"
+
+    def __str__(self):
+        return f"{self.user} - {self.ingredient}"
@@ -0,0 +1,182 @@
+import json
+from collections import defaultdict
+from itertools import islice
+
+from django.db import transaction
+
+from api.serializers import RecipeDumpSerializer
+from users.models import User
+
+from .models import Ingredient, IngredientRecipe, Recipe
+
+RECIPE_FIELDS = ("name", "text", "image", "cooking_time")
+
+
+def chunks(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def get_ingredient_rows(recipe_ids):
+    ingredients = defaultdict(list)
+    for recipe_id, name, measurement_unit, amount in (
+        IngredientRecipe.objects.filter(recipe_id__in=recipe_ids)
+        .order_by("pk")
+        .values_list(
+            "recipe_id",
+            "ingredient__name",
+            "ingredient__measurement_unit",
+            "amount",
+        )
+    ):
+        ingredients[recipe_id].append(
+            {
+                "name": name,
+                "measurement_unit": measurement_unit,
+                "amount": amount,
+            }
+        )
+    return ingredients
+
+
+def export_recipes(queryset=None, chunk_size=1000):
+    if queryset is None:
+        queryset = Recipe.objects.all()
+    rows = queryset.order_by("pk").values(
+        "pk", "author__email", *RECIPE_FIELDS
+    ).iterator(chunk_size=chunk_size)
+    for chunk in chunks(rows, chunk_size):
+        ingredients = get_ingredient_rows([row["pk"] for row in chunk])
+        for row in chunk:
+            yield json.dumps(
+                {
+                    "id": row["pk"],
+                    "author": row["author__email"],
+                    **{field: row[field] for field in RECIPE_FIELDS},
+                    "ingredients": ingredients[row["pk"]],
+                },
+                ensure_ascii=False,
+            ) + "\n"
+
+
+def parse_line(number, line):
+    try:
+        item = json.loads(line)
+    except ValueError as error:
+        raise ValueError(f"line {number}: {error}")
+    if not isinstance(item, dict):
+        raise ValueError(f"line {number}: expected a JSON object")
+    return item
+
+
+class RecipeImporter:
+    def __init__(self, default_author=None, batch_size=1000):
+        self.batch_size = batch_size
+        self.default_author_id = (
+            User.objects.get(email=default_author).pk
+            if default_author else None
+        )
+        self.ingredient_ids = dict(
+            Ingredient.objects.values_list("name", "pk")
+        )
+        self.created = 0
+        self.skipped = 0
+        self.errors = []
+
+    def validate(self, number, item):
+        serializer = RecipeDumpSerializer(data=item)
+        if not serializer.is_valid():
+            self.errors.append({"line": number, "errors": serializer.errors})
+            return None
+        data = serializer.validated_data
+        unknown = [
+            ingredient["ingredient"]
+            for ingredient in data["ingredients"]
+            if ingredient["ingredient"] not in self.ingredient_ids
+        ]
+        if unknown:
+            self.errors.append(
+                {
+                    "line": number,
+                    "errors": {
+                        "ingredients": [
+                            f"Unknown ingredient: {name}." for name in unknown
+                        ]
+                    },
+                }
+            )
+            return None
+        return data
+
+    @transaction.atomic
+    def import_lines(self, lines):
+        items = (
+            (number, parse_line(number, line))
+            for number, line in enumerate(lines, 1)
+            if line.strip()
+        )
+        for batch in chunks(items, self.batch_size):
+            self.import_batch(batch)
+        return {
+            "created": self.created,
+            "skipped": self.skipped,
+            "errors": self.errors,
+        }
+
+    def import_batch(self, batch):
+        author_ids = dict(
+            User.objects.filter(
+                email__in={item.get("author") for _, item in batch}
+            ).values_list("email", "pk")
+        )
+        recipes = []
+        ingredient_rows = []
+        for number, item in batch:
+            data = self.validate(number, item)
+            author_id = author_ids.get(
+                item.get("author"), self.default_author_id
+            )
+            if data is None or author_id is None:
+                self.skipped += 1
+                continue
+            recipes.append(
+                Recipe(
+                    author_id=author_id,
+                    **{field: data[field] for field in RECIPE_FIELDS},
+                )
+            )
+            ingredient_rows.append(
+                {
+                    self.ingredient_ids[ingredient["ingredient"]]: (
+                        ingredient["amount"]
+                    )
+                    for ingredient in data["ingredients"]
+                }
+            )
+        if not recipes:
+            return
+        last_id = Recipe.objects.order_by("-pk").values_list(
+            "pk", flat=True
+        ).first() or 0
+        Recipe.objects.bulk_create(recipes)
+        if recipes[0].pk is None:
+            for recipe, pk in zip(
+                recipes,
+                Recipe.objects.filter(pk__gt=last_id)
+                .order_by("pk")
+                .values_list("pk", flat=True),
+            ):
+                recipe.pk = pk
+        IngredientRecipe.objects.bulk_create(
+            [
+                IngredientRecipe(
+                    recipe_id=recipe.pk,
+                    ingredient_id=ingredient_id,
+                    amount=amount,
+                )
+                for recipe, amounts in zip(recipes, ingredient_rows)
+                for ingredient_id, amount in amounts.items()
+            ]
+        )
+        self.created += len(recipes)
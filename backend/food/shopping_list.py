@@ -0,0 +1,93 @@
+from django.core.exceptions import EmptyResultSet
+from django.db import connections, models, router, transaction
+from django.db.models import F, Sum, Value
+from django.db.models.functions import Cast
+
+from .models import Purchase, ShoppingListItem
+
+INGREDIENT_RECIPE = "recipe__ingredient_recipes"
+SHOPPING_LIST_FIELDS = ("id", "name", "measurement_unit", "amount")
+
+
+def get_purchased_amounts(purchases, sign=1, ingredient_id=None):
+    filters = {f"{INGREDIENT_RECIPE}__isnull": False}
+    if ingredient_id is not None:
+        filters[f"{INGREDIENT_RECIPE}__ingredient_id"] = ingredient_id
+    return purchases.filter(**filters).values(
+        "user_id", f"{INGREDIENT_RECIPE}__ingredient_id"
+    ).annotate(
+        amount=Sum(
+            Cast(f"{INGREDIENT_RECIPE}__amount", models.BigIntegerField())
+            * F("servings")
+            * F(f"{INGREDIENT_RECIPE}__ingredient__base_unit_factor")
+            * Value(sign)
+        )
+    ).order_by()
+
+
+def apply_purchases(purchases, sign, ingredient_id=None):
+    connection = connections[router.db_for_write(ShoppingListItem)]
+    quote = connection.ops.quote_name
+    opts = ShoppingListItem._meta
+    table = quote(opts.db_table)
+    user, ingredient, amount = (
+        quote(opts.get_field(name).column)
+        for name in ("user", "ingredient", "amount")
+    )
+    query = get_purchased_amounts(purchases, sign, ingredient_id).query
+    try:
+        sql, params = query.sql_with_params()
+    except EmptyResultSet:
+        return
+    with transaction.atomic(using=connection.alias):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {table} ({user}, {ingredient}, {amount}) {sql} "
+                f"ON CONFLICT ({user}, {ingredient}) DO UPDATE "
+                f"SET {amount} = {table}.{amount} + EXCLUDED.{amount}",
+                params,
+            )
+        if sign < 0:
+            ShoppingListItem.objects.filter(
+                user_id__in=purchases.values("user_id"), amount__lte=0
+            ).delete()
+
+
+def add_purchases(purchases):
+    apply_purchases(purchases, 1)
+
+
+def remove_purchases(purchases):
+    apply_purchases(purchases, -1)
+
+
+@transaction.atomic
+def rebuild_shopping_lists(user_ids=None):
+    items = ShoppingListItem.objects.all()
+    purchases = Purchase.objects.all()
+    if user_ids is not None:
+        user_ids = list(user_ids)
+        items = items.filter(user_id__in=user_ids)
+        purchases = purchases.filter(user_id__in=user_ids)
+    items.delete()
+    add_purchases(purchases)
+
+
+@transaction.atomic
+def rebuild_ingredient_rows(ingredient_id):
+    ShoppingListItem.objects.filter(ingredient_id=ingredient_id).delete()
+    apply_purchases(Purchase.objects.all(), 1, ingredient_id)
+
+
+def get_shopping_list(user):
+    return [
+        dict(zip(SHOPPING_LIST_FIELDS, row))
+        for row in user.shopping_list.order_by(
+            "ingredient__name"
+        ).values_list(
+            "ingredient_id",
+            "ingredient__name",
+            "ingredient__base_unit",
+            "amount",
+        )
+    ]
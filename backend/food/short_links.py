@@ -0,0 +1,35 @@
+import string
+
+ALPHABET = string.digits + string.ascii_letters
+CHECKSUM_ALPHABET = string.ascii_letters
+
+
+def _checksum(body):
+    return CHECKSUM_ALPHABET[
+        sum(
+            (position + 1) * ALPHABET.index(char)
+            for position, char in enumerate(body)
+        ) % len(CHECKSUM_ALPHABET)
+    ]
+
+
+def encode_short_code(recipe_id):
+    body = ""
+    while True:
+        recipe_id, remainder = divmod(recipe_id, len(ALPHABET))
+        body = ALPHABET[remainder] + body
+        if not recipe_id:
+            break
+    return body + _checksum(body)
+
+
+def decode_short_code(code):
+    body, checksum = code[:-1], code[-1:]
+    if not body or any(char not in ALPHABET for char in body):
+        return None
+    if _checksum(body) != checksum:
+        return None
+    recipe_id = 0
+    for char in body:
+        recipe_id = recipe_id * len(ALPHABET) + ALPHABET.index(char)
+    return recipe_id
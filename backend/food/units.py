@@ -0,0 +1,8 @@
+from const import UNIT_CONVERSIONS
+
+
+def get_base_unit(measurement_unit):
+    measurement_unit = measurement_unit.strip()
+    return UNIT_CONVERSIONS.get(
+        measurement_unit.lower(), (measurement_unit, 1)
+    )
@@ -1,12 +1,17 @@
 from django.urls import path
 
-from .views import short_link_to_recipe
+from .views import legacy_short_link_to_recipe, short_link_to_recipe
 
 app_name = "food"
 
 urlpatterns = [
     path(
         "s/<int:recipe_id>/",
+        legacy_short_link_to_recipe,
+        name="legacy-short-link-to-recipe"
+    ),
+    path(
+        "s/<str:code>/",
         short_link_to_recipe,
         name="short-link-to-recipe"
     ),
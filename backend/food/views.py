@@ -1,5 +1,25 @@
-from django.shortcuts import redirect
+from django.http import Http404, HttpResponsePermanentRedirect
+from django.utils.cache import patch_cache_control
 
+from .short_links import decode_short_code
 
-def short_link_to_recipe(request, recipe_id):
-    return redirect(f"/recipes/{recipe_id}/")
+SHORT_LINK_CACHE_SECONDS = 60 * 60 * 24 * 30
+
+
+def redirect_to_recipe(recipe_id):
+    response = HttpResponsePermanentRedirect(f"/recipes/{recipe_id}/")
+    patch_cache_control(
+        response, public=True, max_age=SHORT_LINK_CACHE_SECONDS
+    )
+    return response
+
+
+def short_link_to_recipe(request, code):
+    recipe_id = decode_short_code(code)
+    if recipe_id is None:
+        raise Http404
+    return redirect_to_recipe(recipe_id)
+
+
+def legacy_short_link_to_recipe(request, recipe_id):
+    return redirect_to_recipe(recipe_id)
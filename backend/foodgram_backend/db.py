@@ -0,0 +1,71 @@
+from functools import reduce
+from operator import or_
+
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db import connections, router
+from django.db.models import Case, FloatField, Q, Value, When
+from django.db.models.functions import Greatest
+
+
+def insert_ignore_conflicts(model_class, rows):
+    if not rows:
+        return []
+    opts = model_class._meta
+    fields = [opts.get_field(name) for name in rows[0]]
+    fields += [
+        field
+        for field in opts.concrete_fields
+        if field.has_default() and field not in fields
+    ]
+    names = [*rows[0], *(field.name for field in fields[len(rows[0]):])]
+    columns = [field.column for field in fields]
+    connection = connections[router.db_for_write(model_class)]
+    placeholders = f"({', '.join(['%s'] * len(columns))})"
+    with connection.cursor() as cursor:
+        quote = connection.ops.quote_name
+        cursor.execute(
+            f"INSERT INTO {quote(opts.db_table)} "
+            f"({', '.join(quote(column) for column in columns)}) "
+            f"VALUES {', '.join([placeholders] * len(rows))} "
+            f"ON CONFLICT DO NOTHING RETURNING {quote(opts.pk.column)}",
+            [
+                field.get_db_prep_save(
+                    row[name] if name in row else field.get_default(),
+                    connection,
+                )
+                for row in rows
+                for name, field in zip(names, fields)
+            ],
+        )
+        return [pk for pk, in cursor.fetchall()]
+
+
+def any_field_matches(fields, lookup, value):
+    return reduce(
+        or_, (Q(**{f"{field}__{lookup}": value}) for field in fields)
+    )
+
+
+def trigram_search(queryset, fields, value):
+    matches = any_field_matches(fields, "icontains", value)
+    if connections[queryset.db].vendor != "postgresql":
+        return queryset.filter(matches).annotate(
+            similarity=Case(
+                When(
+                    any_field_matches(fields, "istartswith", value),
+                    then=Value(1.0),
+                ),
+                default=Value(0.0),
+                output_field=FloatField(),
+            )
+        ).order_by("-similarity", *fields)
+    similarities = [TrigramSimilarity(field, value) for field in fields]
+    return queryset.filter(
+        matches | any_field_matches(fields, "trigram_similar", value)
+    ).annotate(
+        similarity=(
+            Greatest(*similarities)
+            if len(similarities) > 1
+            else similarities[0]
+        )
+    ).order_by("-similarity", *fields)
@@ -1,6 +1,9 @@
 import os
+import sys
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 SECRET_KEY = os.getenv("SECRET_KEY", "SECRET_KEY")
@@ -17,6 +20,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework.authtoken",
     "rest_framework",
     "django_filters",
@@ -27,6 +31,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "api.middleware.RequestInstrumentationMiddleware",
+    "api.middleware.ProfilingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -36,6 +42,29 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+REQUEST_INSTRUMENTATION = (
+    os.getenv("REQUEST_INSTRUMENTATION", "false").lower() == "true"
+)
+REQUEST_QUERY_BUDGET = int(os.getenv("REQUEST_QUERY_BUDGET", 20))
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "false").lower() == "true"
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+PROFILING_DIR = Path(os.getenv("PROFILING_DIR", BASE_DIR / "profiles"))
+PROFILING_INTERVAL = float(os.getenv("PROFILING_INTERVAL", 0.005))
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "api": {
+            "handlers": ["console"],
+            "level": os.getenv("API_LOG_LEVEL", "INFO"),
+        },
+    },
+}
+
 ROOT_URLCONF = "foodgram_backend.urls"
 
 TEMPLATES = [
@@ -65,9 +94,68 @@ DATABASES = {
         "PASSWORD": os.getenv("POSTGRES_PASSWORD", ""),
         "HOST": os.getenv("DB_HOST", ""),
         "PORT": os.getenv("DB_PORT", 5432),
+        "CONN_MAX_AGE": int(os.getenv("DB_CONN_MAX_AGE", 60)),
+        "DISABLE_SERVER_SIDE_CURSORS": (
+            os.getenv("DB_POOL_MODE", "session") == "transaction"
+        ),
     }
 }
 
+CACHE_BACKENDS = {
+    "locmem": "django.core.cache.backends.locmem.LocMemCache",
+    "file": "django.core.cache.backends.filebased.FileBasedCache",
+    "memcached": "django.core.cache.backends.memcached.PyMemcacheCache",
+    "redis": "django_redis.cache.RedisCache",
+}
+
+CACHES = {
+    "default": {
+        "BACKEND": CACHE_BACKENDS[os.getenv("CACHE_BACKEND", "locmem")],
+        "LOCATION": os.getenv("CACHE_LOCATION", "foodgram"),
+        "TIMEOUT": int(os.getenv("CACHE_TIMEOUT", 300)),
+        "KEY_PREFIX": "foodgram",
+    },
+    "local": {
+        "BACKEND": CACHE_BACKENDS["locmem"],
+        "LOCATION": "foodgram-local",
+        "TIMEOUT": int(os.getenv("CACHE_LOCAL_TIMEOUT", 5)),
+    },
+}
+
+PASSWORD_HASHER_PROFILES = {
+    "default": [
+        "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+        "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+        "django.contrib.auth.hashers.Argon2PasswordHasher",
+        "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    ],
+    "fast": [
+        "django.contrib.auth.hashers.MD5PasswordHasher",
+        "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+    ],
+}
+
+FAST_PASSWORD_HASHER_COMMANDS = (
+    "test",
+    "create_users",
+    "generate_fake_data",
+    "benchmark_api",
+)
+
+PASSWORD_HASHER_PROFILE = os.getenv("PASSWORD_HASHER_PROFILE", "default")
+
+if PASSWORD_HASHER_PROFILE == "fast" and not (
+    Path(sys.argv[0]).name == "manage.py"
+    and len(sys.argv) > 1
+    and sys.argv[1] in FAST_PASSWORD_HASHER_COMMANDS
+):
+    raise ImproperlyConfigured(
+        "PASSWORD_HASHER_PROFILE=fast is only allowed for the commands "
+        f"{', '.join(FAST_PASSWORD_HASHER_COMMANDS)}."
+    )
+
+PASSWORD_HASHERS = PASSWORD_HASHER_PROFILES[PASSWORD_HASHER_PROFILE]
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -96,6 +184,10 @@ USE_TZ = True
 STATIC_URL = "/static/"
 STATIC_ROOT = BASE_DIR / "collected_static"
 
+STARTUP_STATE_DIR = Path(
+    os.getenv("STARTUP_STATE_DIR", BASE_DIR / "startup_state")
+)
+
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
@@ -104,10 +196,25 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
-    ]
+        "api.authentication.CachedTokenAuthentication",
+    ],
+    "DEFAULT_RENDERER_CLASSES": [
+        "api.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "api.renderers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
 }
 
+AUTH_TOKEN_CACHE_TIMEOUT = int(os.getenv("AUTH_TOKEN_CACHE_TIMEOUT", 60))
+
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", 1))
+JOB_STALE_TIMEOUT = int(os.getenv("JOB_STALE_TIMEOUT", 600))
+JOB_RESULT_TTL = int(os.getenv("JOB_RESULT_TTL", 86400))
+
 AUTH_USER_MODEL = "users.User"
 
 DJOSER = {
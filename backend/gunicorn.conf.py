@@ -0,0 +1,10 @@
+import os
+
+from prometheus_client import multiprocess
+
+bind = "0.0.0.0:8000"
+
+
+def child_exit(server, worker):
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        multiprocess.mark_process_dead(worker.pid)
@@ -1,12 +1,20 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 
+from foodgram_backend.db import trigram_search
+
 from .models import Subscription, User
 
 
 @admin.register(User)
 class CustomUserAdmin(UserAdmin):
     search_fields = ("email", "username", "first_name", "last_name")
+    show_full_result_count = False
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return super().get_search_results(request, queryset, search_term)
+        return trigram_search(queryset, self.search_fields, search_term), False
 
 
 @admin.register(Subscription)
@@ -15,3 +23,6 @@ class SubscriptionAdmin(admin.ModelAdmin):
         "subscriber",
         "author",
     )
+    list_select_related = ("subscriber", "author")
+    autocomplete_fields = ("subscriber", "author")
+    show_full_result_count = False
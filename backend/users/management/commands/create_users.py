@@ -0,0 +1,86 @@
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+
+from users.models import User
+
+
+def make_email(prefix, number):
+    return f"{prefix}{number}@example.com"
+
+
+def get_free_numbers(prefix, count):
+    pattern = re.compile(rf"{re.escape(prefix)}(\d+)")
+    usernames = User.objects.filter(username__startswith=prefix).values_list(
+        "username", flat=True
+    )
+    start = max(
+        (
+            int(match.group(1))
+            for match in map(pattern.fullmatch, usernames.iterator())
+            if match
+        ),
+        default=-1,
+    ) + 1
+    numbers = []
+    while len(numbers) < count:
+        candidates = range(start, start + count - len(numbers))
+        taken = set(
+            User.objects.filter(
+                email__in=[make_email(prefix, number) for number in candidates]
+            ).values_list("email", flat=True)
+        )
+        numbers.extend(
+            number
+            for number in candidates
+            if make_email(prefix, number) not in taken
+        )
+        start = candidates.stop
+    return numbers
+
+
+class Command(BaseCommand):
+    help = "Создаёт пользователей пачками, хэшируя пароли в пуле процессов."
+
+    def add_arguments(self, parser):
+        parser.add_argument("count", type=int)
+        parser.add_argument("--prefix", default="user")
+        parser.add_argument("--password", default="foodgram-password")
+        parser.add_argument("--workers", type=int, default=None)
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        start_time = time.perf_counter()
+        prefix = options["prefix"]
+        numbers = get_free_numbers(prefix, options["count"])
+
+        with ProcessPoolExecutor(
+            max_workers=options["workers"], initializer=django.setup
+        ) as executor:
+            passwords = executor.map(
+                make_password,
+                [options["password"]] * options["count"],
+                chunksize=max(1, options["count"] // 64),
+            )
+            users = [
+                User(
+                    username=f"{prefix}{number}",
+                    email=make_email(prefix, number),
+                    first_name=prefix.capitalize(),
+                    last_name=str(number),
+                    password=password,
+                )
+                for number, password in zip(numbers, passwords)
+            ]
+        User.objects.bulk_create(users, batch_size=options["batch_size"])
+
+        elapsed = time.perf_counter() - start_time
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Создано пользователей: {len(users)} за {elapsed:.2f} с"
+            )
+        )
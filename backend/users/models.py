@@ -37,11 +37,17 @@ class User(AbstractUser):
 
 class Subscription(models.Model):
     subscriber = models.ForeignKey(
-        User, on_delete=models.CASCADE, verbose_name="Подписчик"
+        User,
+        on_delete=models.CASCADE,
+        db_index=False,
+        verbose_name="Подписчик",
     )
     author = models.ForeignKey(
-        User, on_delete=models.CASCADE, related_name="subscribers",
-        verbose_name="Автор"
+        User,
+        on_delete=models.CASCADE,
+        db_index=False,
+        related_name="subscribers",
+        verbose_name="Автор",
     )
 
     class Meta:
@@ -51,6 +57,12 @@ class Subscription(models.Model):
                 name="unique_author_subscriber"
             )
         ]
+        indexes = [
+            models.Index(
+                fields=("subscriber", "author"),
+                name="subscription_subscriber_idx",
+            )
+        ]
         verbose_name = "подписка"
         verbose_name_plural = "Подписки"
 